@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The Portal runs from Portal/ (uvicorn app.main:app); the modules it shares with
+# the root apps live in common/ at the repository root
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _REPO_DIR not in sys.path:
+    sys.path.append(_REPO_DIR)
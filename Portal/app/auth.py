@@ -1,16 +1,23 @@
 from datetime import datetime, timedelta
 import os
+import time
 from jose import JWTError, jwt
 from fastapi import HTTPException, status
-from . import schemas, crud
-from passlib.context import CryptContext
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from . import models, schemas, crud
+from common.cache import TTLCache
+from .password_pool import pool as password_pool
 
 SECRET_KEY = os.getenv("SECRET_KEY", "izveRTCNfsVWOUPKXGhJUiPl6LgdEc1gHYWiDtU2i_M")  # Replace with a secure key
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Decoded claims keyed by token, each kept only until the token's own exp
+token_cache = TTLCache(maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "10000")))
+# schemas.User snapshots keyed by username; invalidated when a user row changes
+user_cache = TTLCache(maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")), ttl=float(os.getenv("USER_CACHE_TTL", "300")))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -30,15 +37,64 @@ def authenticate_user(db, username: str, password: str):
         return False
     return user
 
-def verify_token(token: str):
+def decode_token(token: str) -> dict:
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        return username
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    
+    if "exp" in claims:
+        token_cache.set(token, claims, ttl=claims["exp"] - time.time())
+    return claims
+
+def verify_token(token: str):
+    username: str = decode_token(token).get("sub")
+    if username is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return username
+
+# Cached user lookups for authenticated requests
+def get_cached_user(username: str):
+    return user_cache.get(username)
+
+def cache_user(user) -> schemas.User:
+    # Store a detached pydantic snapshot, never a session-bound ORM object
+    snapshot = schemas.User(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        role=schemas.UserRole(user.role.lower()),
+        company=user.company
+    )
+    user_cache.set(user.username, snapshot)
+    return snapshot
+
+def invalidate_user(username: str):
+    user_cache.pop(username)
+
+# Any insert / update / delete of a User object drops its cache entry once the
+# transaction commits (old and new username, in case it was renamed). INSERT /
+# UPDATE / DELETE statements bypass these mapper events, so code that writes
+# users with them (crud.create_user) calls invalidate_user() itself.
+@event.listens_for(models.User, "after_insert")
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _remember_changed_user(mapper, connection, target):
+    history = inspect(target).attrs.username.history
+    names = {target.username, *history.deleted}
+    object_session(target).info.setdefault("changed_usernames", set()).update(names)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for username in session.info.pop("changed_usernames", ()):
+        invalidate_user(username)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop("changed_usernames", None)
+
+# Runs in the bounded bcrypt process pool (blocking); async callers await password_pool.hash
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return password_pool.hash_sync(password)
\ No newline at end of file
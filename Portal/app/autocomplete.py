@@ -0,0 +1,257 @@
+import bisect
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event, text
+from . import changes, models
+from .database import engine
+
+_logger = logging.getLogger(__name__)
+
+# Search-box suggestions: per field, a sorted array of case-folded terms searched
+# with bisect, each weighted by how many rows carry it, so a keystroke costs a
+# bisect plus (for a prefix not seen lately) a scan of the matching slice, and
+# never a LIKE 'x%' over the tables. Each field lists its (table, column) sources.
+SOURCES = {
+    "title": [("job_postings", "title")],
+    "company": [("job_postings", "company"), ("companies", "name")],
+    "location": [("job_postings", "location"), ("companies", "location")],
+}
+FIELDS = tuple(SOURCES)
+
+# Terms kept per field; past that the least used are dropped (their rows still exist,
+# they are just not suggested), which bounds memory however many postings there are
+AUTOCOMPLETE_MAX_TERMS = int(os.getenv("AUTOCOMPLETE_MAX_TERMS", "200000"))
+# Suggestions per request at most; the top list of a prefix is cached at this length
+AUTOCOMPLETE_TOP_K = 20
+# Prefixes whose top list is cached, per field
+AUTOCOMPLETE_CACHE = int(os.getenv("AUTOCOMPLETE_CACHE", "10000"))
+# Other workers' writes are picked up at most this late; this process's own at the next request
+AUTOCOMPLETE_SYNC_SECONDS = float(os.getenv("AUTOCOMPLETE_SYNC_SECONDS", "1"))
+
+# Every write to a source column appends -1 for the old term and +1 for the new one
+# to autocomplete_changes (SQLite triggers, so Core and raw SQL writes count too).
+# Each worker replays the rows after the last seq it applied. Only the newest
+# KEEP_CHANGES rows are kept; a worker further behind than that rebuilds.
+CHANGE_TABLE = models.AutocompleteChange.__tablename__
+KEEP_CHANGES = 100000
+
+
+def _delta(field, row, column, delta, changed_only=False):
+    condition = f"{row}.{column} IS NOT NULL"
+    if changed_only:
+        condition += f" AND old.{column} IS NOT new.{column}"
+    return f"INSERT INTO {CHANGE_TABLE} (field, term, delta) SELECT '{field}', {row}.{column}, {delta} WHERE {condition};"
+
+
+def _trigger_ddl():
+    by_table = {}
+    for field, sources in SOURCES.items():
+        for table, column in sources:
+            by_table.setdefault(table, []).append((field, column))
+    statements = []
+    for table, columns in by_table.items():
+        names = ", ".join(column for _, column in columns)
+        added = " ".join(_delta(field, "new", column, 1) for field, column in columns)
+        removed = " ".join(_delta(field, "old", column, -1) for field, column in columns)
+        updated = " ".join(
+            _delta(field, "old", column, -1, True) + " " + _delta(field, "new", column, 1, True) for field, column in columns
+        )
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_{table}_ai AFTER INSERT ON {table} BEGIN {added} END",
+            f"CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_{table}_ad AFTER DELETE ON {table} BEGIN {removed} END",
+            f"CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_{table}_au AFTER UPDATE OF {names} ON {table} BEGIN {updated} END",
+        ]
+    statements.append(
+        f"CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_prune AFTER INSERT ON {CHANGE_TABLE} BEGIN "
+        f"DELETE FROM {CHANGE_TABLE} WHERE seq <= new.seq - {KEEP_CHANGES}; END"
+    )
+    return statements
+
+
+TRIGGER_DDL = _trigger_ddl()
+
+
+@event.listens_for(models.Base.metadata, "after_create")
+def _install(metadata, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    for statement in TRIGGER_DDL:
+        connection.exec_driver_sql(statement)
+
+
+SYNC_SQL = f"SELECT seq, field, term, delta FROM {CHANGE_TABLE} WHERE seq > ? ORDER BY seq"
+
+
+def _terms_sql(field):
+    counts = " UNION ALL ".join(
+        f"SELECT {column} AS term, COUNT(*) AS n FROM {table} WHERE {column} IS NOT NULL GROUP BY {column}"
+        for table, column in SOURCES[field]
+    )
+    return f"SELECT term, SUM(n) AS weight FROM ({counts}) GROUP BY term ORDER BY weight DESC LIMIT :limit"
+
+
+def _normalize(term):
+    return " ".join(term.split()).casefold()
+
+
+class PrefixIndex:
+    """Weighted terms of one field, searchable by prefix. Not thread-safe on its own."""
+
+    def __init__(self, max_terms: int, top_k: int, cache_size: int):
+        self.max_terms = max_terms
+        self.top_k = top_k
+        self.cache_size = cache_size
+        self._keys = []  # case-folded terms, sorted
+        self._weights = {}  # key -> rows carrying it
+        self._display = {}  # key -> term as first seen, only where it differs from the key
+        self._top = OrderedDict()  # prefix -> its top_k keys, heaviest first (LRU)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def load(self, rows):
+        self._weights, self._display = {}, {}
+        for term, weight in rows:
+            self._count(term, weight)
+        self._trim(self.max_terms)
+        self._keys = sorted(self._weights)
+        self._top.clear()
+
+    def _count(self, term, delta):
+        key = _normalize(term)
+        if not key:
+            return None, 0
+        weight = self._weights.get(key, 0) + delta
+        if weight > 0:
+            self._weights[key] = weight
+            if key != term and key not in self._display:
+                self._display[key] = term
+        else:
+            self._weights.pop(key, None)
+            self._display.pop(key, None)
+        return key, weight
+
+    def _trim(self, size):
+        if len(self._weights) <= size:
+            return False
+        for key in heapq.nsmallest(len(self._weights) - size, self._weights, key=self._weights.__getitem__):
+            del self._weights[key]
+            self._display.pop(key, None)
+        return True
+
+    def add(self, term: str, delta: int):
+        is_new = _normalize(term) not in self._weights
+        key, weight = self._count(term, delta)
+        if key is None or (is_new and weight <= 0):
+            return
+        if is_new:
+            bisect.insort(self._keys, key)
+        elif weight <= 0:
+            del self._keys[bisect.bisect_left(self._keys, key)]
+        # Past the bound by a tenth, drop back to it in one go (this rebuilds the array)
+        if len(self._keys) > self.max_terms * 1.1 and self._trim(self.max_terms):
+            self._keys = sorted(self._weights)
+            self._top.clear()
+            return
+        self._update_top(key, weight, delta)
+
+    def _update_top(self, key, weight, delta):
+        # Patch the cached top lists of the key's prefixes instead of dropping them
+        rank = self._rank
+        for end in range(1, len(key) + 1):
+            prefix = key[:end]
+            top = self._top.get(prefix)
+            if top is None:
+                continue
+            if key in top:
+                if delta < 0:
+                    del self._top[prefix]  # something outside the list may now rank higher
+                else:
+                    top.sort(key=rank)
+            elif weight > 0 and (len(top) < self.top_k or rank(key) < rank(top[-1])):
+                bisect.insort(top, key, key=rank)
+                del top[self.top_k:]
+
+    def _rank(self, key):
+        return -self._weights[key], key
+
+    def complete(self, prefix: str, limit: int):
+        key = _normalize(prefix)
+        top = self._top.get(key)
+        if top is None:
+            lo = bisect.bisect_left(self._keys, key)
+            hi = bisect.bisect_left(self._keys, key + "\U0010ffff", lo)
+            top = heapq.nsmallest(self.top_k, self._keys[lo:hi], key=self._rank)
+            self._top[key] = top
+            if len(self._top) > self.cache_size:
+                self._top.popitem(last=False)
+        else:
+            self._top.move_to_end(key)
+        return [{"value": self._display.get(k, k), "count": self._weights[k]} for k in top[:limit]]
+
+
+class Autocomplete:
+    """One PrefixIndex per field, built from the tables and kept current from autocomplete_changes."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.indexes = {field: PrefixIndex(AUTOCOMPLETE_MAX_TERMS, AUTOCOMPLETE_TOP_K, AUTOCOMPLETE_CACHE) for field in FIELDS}
+        self._seq = 0
+        self._synced_at = 0.0
+        self._seen_version = None
+        self._lock = threading.Lock()  # guards the indexes
+        self._sync_lock = threading.Lock()  # one catch-up query at a time
+
+    def build(self):
+        """Load every field from its source tables; call at startup (and to repair)."""
+        started = time.perf_counter()
+        with self._sync_lock:
+            version = changes.notifier.version
+            with self.engine.begin() as conn:  # one snapshot: the terms and the seq they include
+                seq = conn.execute(text(f"SELECT IFNULL(MAX(seq), 0) FROM {CHANGE_TABLE}")).scalar()
+                terms = {field: conn.execute(text(_terms_sql(field)), {"limit": AUTOCOMPLETE_MAX_TERMS}).all() for field in FIELDS}
+            with self._lock:
+                for field, rows in terms.items():
+                    self.indexes[field].load(rows)
+                self._seq, self._synced_at, self._seen_version = seq, time.monotonic(), version
+        _logger.info(
+            "Autocomplete built in %.2fs: %s", time.perf_counter() - started,
+            ", ".join(f"{len(index)} {field}" for field, index in self.indexes.items()),
+        )
+
+    def sync(self):
+        version = changes.notifier.version
+        if version == self._seen_version and time.monotonic() - self._synced_at < AUTOCOMPLETE_SYNC_SECONDS:
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            return  # another request is catching up; answer from what is loaded
+        try:
+            self._synced_at, self._seen_version = time.monotonic(), version
+            with self.engine.connect() as conn:
+                rows = conn.exec_driver_sql(SYNC_SQL, (self._seq,)).all()
+            if not rows:
+                return
+            if rows[0].seq != self._seq + 1:
+                _logger.warning("Autocomplete fell more than %d changes behind; rebuilding", KEEP_CHANGES)
+            else:
+                with self._lock:
+                    for _, field, term, delta in rows:
+                        if field in self.indexes:
+                            self.indexes[field].add(term, delta)
+                    self._seq = rows[-1].seq
+                return
+        finally:
+            self._sync_lock.release()
+        self.build()
+
+    def complete(self, field: str, prefix: str, limit: int):
+        self.sync()
+        with self._lock:
+            return self.indexes[field].complete(prefix, limit)
+
+
+index = Autocomplete(engine)
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import event, select
+from . import models
+from .database import engine
+
+# change_log gets one row per INSERT / UPDATE / DELETE on these tables, written by
+# SQLite triggers (so bulk and raw SQL writes are recorded too). seq is
+# AUTOINCREMENT: it only grows and is never reused, and SQLite's single writer
+# means rows commit in seq order, so "everything after seq N" is a complete
+# incremental sync. Only the newest KEEP_CHANGES rows are kept; a client further
+# behind than that gets a 410 (a "reset" event on the stream) and must resync.
+CHANGE_TABLE = models.ChangeLog.__tablename__
+TRACKED = {"job_postings": "job_posting", "companies": "company", "employers": "employer"}
+KEEP_CHANGES = 1000000
+
+TRIGGER_DDL = [
+    f"""CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_{table}_{suffix} AFTER {op.upper()} ON {table} BEGIN
+        INSERT INTO {CHANGE_TABLE} (entity, entity_id, op) VALUES ('{entity}', {row}.id, '{op}');
+    END"""
+    for table, entity in TRACKED.items()
+    for suffix, op, row in (("ai", "insert", "new"), ("au", "update", "new"), ("ad", "delete", "old"))
+] + [
+    f"CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_prune AFTER INSERT ON {CHANGE_TABLE} BEGIN "
+    f"DELETE FROM {CHANGE_TABLE} WHERE seq <= new.seq - {KEEP_CHANGES}; END"
+]
+
+
+@event.listens_for(models.Base.metadata, "after_create")
+def _install(metadata, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    for statement in TRIGGER_DDL:
+        connection.exec_driver_sql(statement)
+
+
+# Changes returned per request / SSE batch at most
+CHANGES_MAX_BATCH = 1000
+# Other worker processes' commits are not signalled here; waiting streams re-check this often
+CHANGES_POLL_SECONDS = float(os.getenv("CHANGES_POLL_SECONDS", "1"))
+# An SSE comment is sent after this long without changes, to keep proxies from closing the stream
+CHANGES_HEARTBEAT_SECONDS = float(os.getenv("CHANGES_HEARTBEAT_SECONDS", "15"))
+
+_WRITE_RE = re.compile(r'\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|UPDATE|DELETE\s+FROM)\s+"?(\w+)', re.IGNORECASE)
+
+
+class ChangeNotifier:
+    """Wakes up waiting long-polls and streams when this process commits a tracked write."""
+
+    def __init__(self):
+        self._version = 0
+        self._waiters = set()
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._version
+
+    def notify(self):
+        with self._lock:
+            self._version += 1
+            waiters = list(self._waiters)
+        for loop, woken in waiters:
+            try:
+                loop.call_soon_threadsafe(woken.set)
+            except RuntimeError:  # that loop is closed
+                pass
+
+    async def wait(self, version: int, timeout: float) -> bool:
+        """Wait until notify() has run since `version` was read, or `timeout` passes."""
+        woken = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), woken)
+        with self._lock:
+            if self._version != version:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(woken.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    def track(self, engine):
+        # As in http_cache: noted per connection, published once the connection is
+        # back in the pool, i.e. after the commit, so a woken reader sees the rows.
+        if engine is None:
+            return
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _note_write(conn, cursor, statement, parameters, context, executemany):
+            match = _WRITE_RE.match(statement)
+            if match and match.group(1) in TRACKED:
+                conn.info["changes_written"] = True
+
+        @event.listens_for(engine, "commit")
+        def _note_commit(conn):
+            if conn.info.pop("changes_written", False):
+                conn.info["changes_committed"] = True
+
+        @event.listens_for(engine, "rollback")
+        def _discard(conn):
+            conn.info.pop("changes_written", None)
+
+        @event.listens_for(engine.pool, "checkin")
+        def _publish(dbapi_connection, connection_record):
+            if connection_record.info.pop("changes_committed", False):
+                self.notify()
+
+
+notifier = ChangeNotifier()
+
+
+def read_changes(since: int, limit: int):
+    change = models.ChangeLog
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(change.seq, change.entity, change.entity_id, change.op, change.changed_at)
+            .where(change.seq > since).order_by(change.seq).limit(limit)
+        ).all()
+    return [
+        {"seq": seq, "entity": entity, "id": entity_id, "op": op, "changed_at": changed_at.isoformat()}
+        for seq, entity, entity_id, op, changed_at in rows
+    ]
+
+
+async def _read(since: int, limit: int):
+    return await asyncio.to_thread(read_changes, since, limit)
+
+
+def _pruned(since: int, changes) -> bool:
+    # seq has no gaps but the ones the prune trigger leaves; 0 means "all that is kept"
+    return since > 0 and bool(changes) and changes[0]["seq"] > since + 1
+
+
+async def poll_changes(since: int, limit: int, wait: float):
+    """Changes after `since`; with `wait`, hold the request up to that long for the first one."""
+    deadline = time.monotonic() + wait
+    while True:
+        version = notifier.version
+        changes = await _read(since, limit)
+        if _pruned(since, changes):
+            raise HTTPException(status_code=410, detail=f"Changes after {since} are no longer kept; resync from /export")
+        remaining = deadline - time.monotonic()
+        if changes or remaining <= 0:
+            return {"changes": changes, "last_seq": changes[-1]["seq"] if changes else since}
+        await notifier.wait(version, min(remaining, CHANGES_POLL_SECONDS))
+
+
+async def _events(since: int, limit: int):
+    idle_since = time.monotonic()
+    while True:
+        version = notifier.version
+        changes = await _read(since, limit)
+        if _pruned(since, changes):
+            yield f"event: reset\ndata: {json.dumps({'since': since})}\n\n"
+            return
+        for change in changes:
+            yield f"id: {change['seq']}\nevent: change\ndata: {json.dumps(change)}\n\n"
+        if changes:
+            since = changes[-1]["seq"]
+            idle_since = time.monotonic()
+            if len(changes) == limit:
+                continue  # more are waiting
+        elif time.monotonic() - idle_since >= CHANGES_HEARTBEAT_SECONDS:
+            yield ": keep-alive\n\n"
+            idle_since = time.monotonic()
+        await notifier.wait(version, CHANGES_POLL_SECONDS)
+
+
+def stream_changes(since: int, limit: int):
+    # Each event's id is its seq, so a reconnecting EventSource resumes via Last-Event-ID
+    return StreamingResponse(
+        _events(since, limit),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
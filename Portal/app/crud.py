@@ -1,12 +1,14 @@
 import re
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, literal, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException, status
-from passlib.context import CryptContext
 from . import models, schemas, auth
+from .fast_json import schema_columns
+from common.pagination import DEFAULT_PAGE_SIZE, keyset_filter, next_page, paginate
+from .password_pool import pool as password_pool
 from .models import UserRole
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from common.upsert import chunks, dedupe_rows, dialect_insert, insert_unless_exists, unique_violation, upsert_rows
 
 # Regex Patterns
 EMAIL_REGEX = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
@@ -22,45 +24,135 @@ def validate_user_input(user: schemas.UserCreate):
     if not re.match(PASSWORD_REGEX, user.password):
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters long, contain 1 uppercase letter, 1 number, and 1 special character.")
 
-# Password Hashing & Verification
+# Password Hashing & Verification (blocking calls into the bcrypt process pool)
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_pool.verify_sync(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return password_pool.hash_sync(password)
+
+# A clash on a unique column is a 409 with `detail`, as through the write queue;
+# other constraint failures (NOT NULL, CHECK) are raised as they are
+def _raise_conflict(db: Session, exc: IntegrityError, detail: str):
+    db.rollback()
+    if unique_violation(exc):
+        raise HTTPException(status_code=409, detail=detail) from exc
+    raise exc
+
+# Constraint-driven inserts: the unique index, not a SELECT probe, detects duplicates
+def _insert_unless_exists(db: Session, model, values: dict, conflict_columns, detail: str):
+    try:
+        obj = db.scalars(insert_unless_exists(db.get_bind(), model, values, conflict_columns)).first()
+    except IntegrityError as exc:
+        _raise_conflict(db, exc, detail)
+    if obj is not None:
+        db.expunge(obj)  # keep the RETURNING values; commit would expire them and force a reload
+    return obj
+
+def _bulk_upsert(db: Session, model, items, key_column: str, detail: str):
+    table = model.__table__
+    rows = dedupe_rows(table, items, key_column)
+    results = []
+    try:
+        for chunk in chunks(rows):
+            results.extend(db.execute(upsert_rows(db.get_bind(), table, chunk, key_column)).all())
+    except IntegrityError as exc:
+        _raise_conflict(db, exc, detail)
+    db.commit()
+    return {"upserted": len(results), "items": [{"id": r[0], key_column: r[1]} for r in results]}
+
+def user_values(user: schemas.UserCreate, hashed_password: str) -> dict:
+    return {
+        "username": user.username,
+        "email": user.email,
+        "hashed_password": hashed_password,
+        "role": user.role,
+        "company": user.company if user.role in [UserRole.EMPLOYER.value, UserRole.POINT_OF_CONTACT.value] else None,
+    }
+
+EMPLOYER_CONFLICT = "An employer's name or phone is already used by another employer"
+
+# INSERT INTO employers ... SELECT <values> WHERE <company exists> ON CONFLICT (email) DO NOTHING RETURNING *
+# No row back means the email is taken or the company is missing; only then do we look which.
+def employer_insert(bind, employer: schemas.EmployerBase):
+    table = models.Employer.__table__
+    values = {
+        "name": employer.name,
+        "email": employer.email,
+        "phone": employer.phone,
+        "industry": employer.industry,
+        "company_id": employer.company_id,
+    }
+    source = select(*[literal(v, table.c[k].type).label(k) for k, v in values.items()]).where(
+        exists().where(models.Company.id == employer.company_id)
+    )
+    return (
+        dialect_insert(bind, table)
+        .from_select(list(values), source)
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(*table.c)
+    )
+
+# Links only the PoC ids that exist; the caller compares the row count with the request
+def employer_pocs_insert(employer_id: int, poc_ids):
+    source = select(literal(employer_id), models.PointOfContact.id).where(models.PointOfContact.id.in_(poc_ids))
+    return models.employer_poc_association.insert().from_select(["employer_id", "poc_id"], source)
 
 # User Operations
 def get_user_by_username(db: Session, username: str):
     return db.query(models.User).filter(models.User.username == username).first()
 
-def create_user(db: Session, user: schemas.UserCreate):
-    if user.role in [UserRole.EMPLOYER, UserRole.POINT_OF_CONTACT] and not user.company:
+# A cheap probe before signup pays for a bcrypt hash; create_user's insert still
+# catches the race where the name or email is taken in between
+def taken_user_query(user: schemas.UserCreate):
+    return (
+        select(models.User.username)
+        .where(or_(models.User.username == user.username, models.User.email == user.email))
+        .order_by((models.User.username == user.username).desc())
+        .limit(1)
+    )
+
+def taken_user_field(db: Session, user: schemas.UserCreate):
+    """Which of the username (checked first) and email another user already has, or None."""
+    row = db.execute(taken_user_query(user)).first()
+    return None if row is None else ("username" if row.username == user.username else "email")
+
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: str = None):
+    if user.role in [UserRole.EMPLOYER.value, UserRole.POINT_OF_CONTACT.value] and not user.company:
         raise ValueError("Employers and Points of Contact must have a company.")
-    if user.role == UserRole.EMPLOYEE and user.company:
+    if user.role == UserRole.EMPLOYEE.value and user.company:
         raise ValueError("Employees should not have a company.")
 
-    hashed_password = auth.get_password_hash(user.password)
-    db_user = models.User(
-        username=user.username,
-        email=user.email,
-        hashed_password=hashed_password,
-        role=user.role,
-        company=user.company if user.role in [UserRole.EMPLOYER, UserRole.POINT_OF_CONTACT] else None
-    )
-    db.add(db_user)
+    if hashed_password is None:
+        hashed_password = auth.get_password_hash(user.password)
+    db_user = _insert_unless_exists(db, models.User, user_values(user, hashed_password), ["username"],
+                                    "Email already registered")
+    if db_user is None:
+        raise HTTPException(status_code=400, detail="Username already registered")
     db.commit()
-    db.refresh(db_user)
+    auth.invalidate_user(db_user.username)  # an INSERT statement fires no mapper events
     return db_user
 
 # Job Posting Operations
-def get_jobs_by_employer(db: Session, employer_id: int):
-    return db.query(models.JobPosting).filter(models.JobPosting.employer_id == employer_id).all()
+# Newest postings first, keyed on (posted_at, id)
+def get_jobs_by_employer(db: Session, employer_id: int, after: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    query = db.query(models.JobPosting).filter(models.JobPosting.employer_id == employer_id)
+    return paginate(query, [models.JobPosting.posted_at, models.JobPosting.id], after, limit, descending=True)
+
+# Same page as plain Row tuples (schemas.JobPostingWithoutId columns), for the FAST_JSON path
+def get_job_rows_by_employer(db: Session, employer_id: int, after: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    keys = [models.JobPosting.posted_at, models.JobPosting.id]
+    stmt = select(models.JobPosting.id, *schema_columns(models.JobPosting, schemas.JobPostingWithoutId)).where(
+        models.JobPosting.employer_id == employer_id
+    )
+    rows = db.execute(keyset_filter(stmt, keys, after, limit, descending=True)).all()
+    return next_page(rows, keys, limit)
 
 def create_job_posting(db: Session, job: schemas.JobPostingCreate, employer_id: int):
     employer = db.query(models.User).filter(models.User.id == employer_id).first()
     if not employer:
         raise HTTPException(status_code=404, detail="Employer not found.")
-    if employer.role != UserRole.EMPLOYER:
+    if employer.role != UserRole.EMPLOYER.value:
         raise HTTPException(status_code=403, detail="Only employers can create job postings.")
     
     existing_job = db.query(models.JobPosting).filter(
@@ -77,54 +169,69 @@ def create_job_posting(db: Session, job: schemas.JobPostingCreate, employer_id:
     return db_job
 
 # Company Operations
+# Only fields that are Company columns are stored (CompanyBase also carries title/description)
 def create_company(db: Session, company: schemas.CompanyBase):
-    existing_company = db.query(models.Company).filter(models.Company.name == company.name).first()
-    if existing_company:
+    db_company = _insert_unless_exists(db, models.Company, company.model_dump(), ["name"],
+                                       "A company's email or phone is already used by another company")
+    if db_company is None:
         raise HTTPException(status_code=400, detail="Company already exists")
-
-    db_company = models.Company(**company.model_dump())
-    db.add(db_company)
     db.commit()
-    db.refresh(db_company)
     return db_company
 
-def get_companies(db: Session):
-    return db.query(models.Company).all()
+# Insert or update many companies by name in one statement per chunk
+def upsert_companies(db: Session, companies):
+    return _bulk_upsert(db, models.Company, [c.model_dump() for c in companies], "name",
+                        "A company's email or phone is already used by another company")
+
+def get_companies(db: Session, after: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    return paginate(db.query(models.Company), [models.Company.id], after, limit)
+
+def get_company_rows(db: Session, after: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    stmt = select(*schema_columns(models.Company, schemas.Company))
+    rows = db.execute(keyset_filter(stmt, [models.Company.id], after, limit)).all()
+    return next_page(rows, [models.Company.id], limit)
 
 # Point-of-Contact Operations
 def create_poc(db: Session, poc: schemas.PoCBase):
-    existing_poc = db.query(models.PointOfContact).filter(models.PointOfContact.email == poc.email).first()
-    if existing_poc:
+    db_poc = _insert_unless_exists(db, models.PointOfContact, poc.model_dump(), ["email"],
+                                   "A PoC's phone is already used by another PoC")
+    if db_poc is None:
         raise HTTPException(status_code=400, detail="PoC with this email already exists")
-
-    db_poc = models.PointOfContact(name=poc.name, email=poc.email, phone=poc.phone)
-    db.add(db_poc)
     db.commit()
-    db.refresh(db_poc)
     return db_poc
 
-def get_pocs(db: Session):
-    return db.query(models.PointOfContact).all()
+# Insert or update many PoCs by email in one statement per chunk
+def upsert_pocs(db: Session, pocs):
+    return _bulk_upsert(db, models.PointOfContact, [p.model_dump() for p in pocs], "email",
+                        "A PoC's phone is already used by another PoC")
+
+def get_pocs(db: Session, after: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    return paginate(db.query(models.PointOfContact), [models.PointOfContact.id], after, limit)
 
 # Employer Operations
 def create_employer(db: Session, employer: schemas.EmployerBase):
-    existing_employer = db.query(models.Employer).filter(models.Employer.email == employer.email).first()
-    if existing_employer:
-        raise HTTPException(status_code=400, detail="Employer with this email already exists")
-
-    company = db.query(models.Company).filter(models.Company.id == employer.company_id).first()
-    if not company:
+    try:
+        row = db.execute(employer_insert(db.get_bind(), employer)).first()
+    except IntegrityError as exc:
+        _raise_conflict(db, exc, EMPLOYER_CONFLICT)
+    if row is None:
+        if db.scalar(select(exists().where(models.Employer.email == employer.email))):
+            raise HTTPException(status_code=400, detail="Employer with this email already exists")
         raise HTTPException(status_code=400, detail="Company not found")
 
-    poc_list = db.query(models.PointOfContact).filter(models.PointOfContact.id.in_(employer.poc_ids)).all()
-    if len(poc_list) != len(employer.poc_ids):
-        raise HTTPException(status_code=400, detail="One or more PoC IDs not found")
+    if employer.poc_ids:
+        linked = db.execute(employer_pocs_insert(row.id, employer.poc_ids)).rowcount
+        if linked != len(employer.poc_ids):
+            db.rollback()
+            raise HTTPException(status_code=400, detail="One or more PoC IDs not found")
 
-    db_employer = models.Employer(name=employer.name, email=employer.email, phone=employer.phone, company_id=employer.company_id, pocs=poc_list)
-    db.add(db_employer)
     db.commit()
-    db.refresh(db_employer)
-    return db_employer
+    return models.Employer(**row._mapping)
 
-def get_employers(db: Session):
-    return db.query(models.Employer).all()
+def get_employers(db: Session, after: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    # Company and PoCs come back in one IN query each, not one lazy load per employer
+    query = db.query(models.Employer).options(
+        selectinload(models.Employer.company),
+        selectinload(models.Employer.pocs)
+    )
+    return paginate(query, [models.Employer.id], after, limit)
@@ -0,0 +1,172 @@
+from fastapi import HTTPException
+from sqlalchemy import exists, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from . import auth, models, schemas
+from .crud import EMPLOYER_CONFLICT, employer_insert, employer_pocs_insert, taken_user_query, user_values
+from .fast_json import schema_columns
+from .models import UserRole
+from .password_pool import pool as password_pool
+from common.pagination import DEFAULT_PAGE_SIZE, keyset_filter, next_page
+from common.upsert import chunks, dedupe_rows, insert_unless_exists, unique_violation, upsert_rows
+
+# Async counterparts of the functions in crud.py, used when DB_ASYNC=1.
+# Same names, arguments, results and HTTP errors; only the session is async.
+
+
+async def _page(db: AsyncSession, stmt, key_columns, after, limit, descending=False):
+    rows = (await db.scalars(keyset_filter(stmt, key_columns, after, limit, descending))).all()
+    return next_page(rows, key_columns, limit)
+
+
+async def _row_page(db: AsyncSession, stmt, key_columns, after, limit, descending=False):
+    rows = (await db.execute(keyset_filter(stmt, key_columns, after, limit, descending))).all()
+    return next_page(rows, key_columns, limit)
+
+
+async def _raise_conflict(db: AsyncSession, exc: IntegrityError, detail: str):
+    await db.rollback()
+    if unique_violation(exc):
+        raise HTTPException(status_code=409, detail=detail) from exc
+    raise exc
+
+
+async def _insert_unless_exists(db: AsyncSession, model, values: dict, conflict_columns, detail: str):
+    try:
+        return (await db.scalars(insert_unless_exists(db.bind, model, values, conflict_columns))).first()
+    except IntegrityError as exc:
+        await _raise_conflict(db, exc, detail)
+
+
+async def _bulk_upsert(db: AsyncSession, model, items, key_column: str, detail: str):
+    table = model.__table__
+    rows = dedupe_rows(table, items, key_column)
+    results = []
+    try:
+        for chunk in chunks(rows):
+            results.extend((await db.execute(upsert_rows(db.bind, table, chunk, key_column))).all())
+    except IntegrityError as exc:
+        await _raise_conflict(db, exc, detail)
+    await db.commit()
+    return {"upserted": len(results), "items": [{"id": r[0], key_column: r[1]} for r in results]}
+
+
+# User Operations
+async def get_user_by_username(db: AsyncSession, username: str):
+    return await db.scalar(select(models.User).where(models.User.username == username))
+
+async def taken_user_field(db: AsyncSession, user: schemas.UserCreate):
+    row = (await db.execute(taken_user_query(user))).first()
+    return None if row is None else ("username" if row.username == user.username else "email")
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate, hashed_password: str = None):
+    if user.role in [UserRole.EMPLOYER.value, UserRole.POINT_OF_CONTACT.value] and not user.company:
+        raise ValueError("Employers and Points of Contact must have a company.")
+    if user.role == UserRole.EMPLOYEE.value and user.company:
+        raise ValueError("Employees should not have a company.")
+
+    if hashed_password is None:
+        hashed_password = await password_pool.hash(user.password)
+    db_user = await _insert_unless_exists(db, models.User, user_values(user, hashed_password), ["username"],
+                                          "Email already registered")
+    if db_user is None:
+        raise HTTPException(status_code=400, detail="Username already registered")
+    await db.commit()
+    auth.invalidate_user(db_user.username)  # an INSERT statement fires no mapper events
+    return db_user
+
+# Job Posting Operations
+async def get_jobs_by_employer(db: AsyncSession, employer_id: int, after: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    stmt = select(models.JobPosting).where(models.JobPosting.employer_id == employer_id)
+    return await _page(db, stmt, [models.JobPosting.posted_at, models.JobPosting.id], after, limit, descending=True)
+
+async def get_job_rows_by_employer(db: AsyncSession, employer_id: int, after: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    stmt = select(models.JobPosting.id, *schema_columns(models.JobPosting, schemas.JobPostingWithoutId)).where(
+        models.JobPosting.employer_id == employer_id
+    )
+    return await _row_page(db, stmt, [models.JobPosting.posted_at, models.JobPosting.id], after, limit, descending=True)
+
+async def create_job_posting(db: AsyncSession, job: schemas.JobPostingCreate, employer_id: int):
+    employer = await db.get(models.User, employer_id)
+    if not employer:
+        raise HTTPException(status_code=404, detail="Employer not found.")
+    if employer.role != UserRole.EMPLOYER.value:
+        raise HTTPException(status_code=403, detail="Only employers can create job postings.")
+
+    existing_job = await db.scalar(select(models.JobPosting).where(
+        models.JobPosting.employer_id == employer_id,
+        models.JobPosting.title == job.title
+    ))
+    if existing_job:
+        raise HTTPException(status_code=400, detail="You have already posted this job.")
+
+    db_job = models.JobPosting(**job.model_dump(), employer_id=employer_id)
+    db.add(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+    return db_job
+
+# Company Operations
+async def create_company(db: AsyncSession, company: schemas.CompanyBase):
+    db_company = await _insert_unless_exists(db, models.Company, company.model_dump(), ["name"],
+                                             "A company's email or phone is already used by another company")
+    if db_company is None:
+        raise HTTPException(status_code=400, detail="Company already exists")
+    await db.commit()
+    return db_company
+
+async def upsert_companies(db: AsyncSession, companies):
+    return await _bulk_upsert(db, models.Company, [c.model_dump() for c in companies], "name",
+                              "A company's email or phone is already used by another company")
+
+async def get_companies(db: AsyncSession, after: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    return await _page(db, select(models.Company), [models.Company.id], after, limit)
+
+async def get_company_rows(db: AsyncSession, after: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    stmt = select(*schema_columns(models.Company, schemas.Company))
+    return await _row_page(db, stmt, [models.Company.id], after, limit)
+
+# Point-of-Contact Operations
+async def create_poc(db: AsyncSession, poc: schemas.PoCBase):
+    db_poc = await _insert_unless_exists(db, models.PointOfContact, poc.model_dump(), ["email"],
+                                         "A PoC's phone is already used by another PoC")
+    if db_poc is None:
+        raise HTTPException(status_code=400, detail="PoC with this email already exists")
+    await db.commit()
+    return db_poc
+
+async def upsert_pocs(db: AsyncSession, pocs):
+    return await _bulk_upsert(db, models.PointOfContact, [p.model_dump() for p in pocs], "email",
+                              "A PoC's phone is already used by another PoC")
+
+async def get_pocs(db: AsyncSession, after: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    return await _page(db, select(models.PointOfContact), [models.PointOfContact.id], after, limit)
+
+# Employer Operations
+async def create_employer(db: AsyncSession, employer: schemas.EmployerBase):
+    try:
+        row = (await db.execute(employer_insert(db.bind, employer))).first()
+    except IntegrityError as exc:
+        await _raise_conflict(db, exc, EMPLOYER_CONFLICT)
+    if row is None:
+        if await db.scalar(select(exists().where(models.Employer.email == employer.email))):
+            raise HTTPException(status_code=400, detail="Employer with this email already exists")
+        raise HTTPException(status_code=400, detail="Company not found")
+
+    if employer.poc_ids:
+        linked = (await db.execute(employer_pocs_insert(row.id, employer.poc_ids))).rowcount
+        if linked != len(employer.poc_ids):
+            await db.rollback()
+            raise HTTPException(status_code=400, detail="One or more PoC IDs not found")
+
+    await db.commit()
+    return models.Employer(**row._mapping)
+
+async def get_employers(db: AsyncSession, after: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    # Eager loading is required here: lazy loads are not allowed on an AsyncSession
+    stmt = select(models.Employer).options(
+        selectinload(models.Employer.company),
+        selectinload(models.Employer.pocs)
+    )
+    return await _page(db, stmt, [models.Employer.id], after, limit)
@@ -1,8 +1,9 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+from common.db_engine import SQLITE_PROFILE, SQLITE_PROFILES, apply_sqlite_pragmas, make_engine
 
 # Load environment variables from .env file
 load_dotenv()
@@ -10,11 +11,25 @@ load_dotenv()
 # Use DATABASE_URL from .env, default to SQLite if not provided
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./database.db")
 
-# Ensure compatibility with SQLite
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL)
+# SQLite connections get the PRAGMA profile named by SQLITE_PROFILE (see common/db_engine.py)
+engine = make_engine(DATABASE_URL)
+
+# Async mode: DB_ASYNC=1 serves the data endpoints from an async engine so the
+# event loop, not the threadpool, multiplexes in-flight requests. SQLite uses the
+# aiosqlite driver; other databases must set ASYNC_DATABASE_URL explicitly.
+ASYNC_DB = os.getenv("DB_ASYNC", "0") == "1"
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1) if DATABASE_URL.startswith("sqlite") else None,
+)
+
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL)
+    if ASYNC_DATABASE_URL.startswith("sqlite"):
+        apply_sqlite_pragmas(async_engine.sync_engine, SQLITE_PROFILES[SQLITE_PROFILE])
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 # Base class for SQLAlchemy models
 Base = declarative_base()
@@ -25,8 +40,7 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Import models AFTER defining Base to avoid circular imports
 from . import models  # ✅ Moved here
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Tables are created by main.py at startup, once every module has added its DDL
 
 # Dependency to get DB session
 def get_db():
@@ -35,3 +49,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Async dependency, used instead of get_db when DB_ASYNC=1
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
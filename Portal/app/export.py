@@ -0,0 +1,89 @@
+import csv
+import datetime
+import io
+import json
+import zlib
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from . import models
+from .database import SessionLocal
+
+# Rows fetched from the cursor (and written out) per chunk
+EXPORT_CHUNK_SIZE = 1000
+
+# Entity name -> columns that get exported (users are deliberately not exportable)
+EXPORTS = {
+    "job-postings": [
+        models.JobPosting.id, models.JobPosting.title, models.JobPosting.description,
+        models.JobPosting.company, models.JobPosting.location, models.JobPosting.posted_at,
+        models.JobPosting.employer_id,
+    ],
+    "companies": [
+        models.Company.id, models.Company.name, models.Company.industry, models.Company.about,
+        models.Company.website, models.Company.email, models.Company.phone,
+        models.Company.location, models.Company.established,
+    ],
+    "employers": [
+        models.Employer.id, models.Employer.name, models.Employer.email, models.Employer.phone,
+        models.Employer.industry, models.Employer.company_id,
+    ],
+}
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _iter_chunks(columns):
+    # Own session: the request's get_db session is closed before the body streams
+    stmt = select(*columns).order_by(columns[0]).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    with SessionLocal() as db:
+        for chunk in db.execute(stmt).partitions():
+            yield chunk
+
+
+def _ndjson_lines(columns):
+    keys = [c.key for c in columns]
+    for chunk in _iter_chunks(columns):
+        yield "".join(json.dumps(dict(zip(keys, row)), default=_json_default) + "\n" for row in chunk).encode()
+
+
+def _csv_lines(columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([c.key for c in columns])
+    for chunk in _iter_chunks(columns):
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _gzipped(body):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for data in body:
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_response(entity: str, fmt: str, gzip: bool = False):
+    """Stream a whole table as NDJSON or CSV with memory bounded by one chunk."""
+    columns = EXPORTS.get(entity)
+    if columns is None:
+        raise HTTPException(status_code=404, detail="Unknown export entity")
+
+    body = _ndjson_lines(columns) if fmt == "ndjson" else _csv_lines(columns)
+    headers = {"Content-Disposition": f'attachment; filename="{entity}.{fmt}"'}
+    if gzip:
+        body = _gzipped(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=MEDIA_TYPES[fmt], headers=headers)
@@ -0,0 +1,109 @@
+"""Job posting counts by company, location and industry, for the job board sidebar.
+
+    python -m app.facets --rebuild    (from the Portal directory)
+
+recounts the summary table from job_postings, should it ever drift.
+"""
+import argparse
+from sqlalchemy import event, func, select, text
+from sqlalchemy.orm import Session
+from . import models
+
+# job_posting_facets holds one row per (company, location) with its posting count,
+# so the counts cost a scan of that table (companies x locations rows) however many
+# postings there are. SQLite triggers keep it in step with every INSERT / UPDATE /
+# DELETE on job_postings, ORM or not, and with company industry changes.
+FACET_TABLE = models.JobPostingFacet.__tablename__
+FACETS = ("company", "location", "industry")
+
+_key = "company = IFNULL({row}.company, '') AND location = IFNULL({row}.location, '')"
+
+_ADD = f"""
+    INSERT INTO {FACET_TABLE} (company, location, industry, postings)
+    VALUES (IFNULL(new.company, ''), IFNULL(new.location, ''), (SELECT industry FROM companies WHERE name = new.company), 1)
+    ON CONFLICT (company, location) DO UPDATE SET postings = postings + 1;"""
+_REMOVE = f"""
+    UPDATE {FACET_TABLE} SET postings = postings - 1 WHERE {_key.format(row="old")};
+    DELETE FROM {FACET_TABLE} WHERE {_key.format(row="old")} AND postings <= 0;"""
+_INDUSTRY = f"""
+    UPDATE {FACET_TABLE} SET industry = (SELECT industry FROM companies WHERE name = {FACET_TABLE}.company)
+    WHERE company IN ({{names}});"""
+
+TRIGGER_DDL = [
+    f"CREATE TRIGGER IF NOT EXISTS {FACET_TABLE}_ai AFTER INSERT ON job_postings BEGIN {_ADD} END",
+    f"CREATE TRIGGER IF NOT EXISTS {FACET_TABLE}_ad AFTER DELETE ON job_postings BEGIN {_REMOVE} END",
+    f"CREATE TRIGGER IF NOT EXISTS {FACET_TABLE}_au AFTER UPDATE OF company, location ON job_postings BEGIN {_REMOVE} {_ADD} END",
+    f"CREATE TRIGGER IF NOT EXISTS {FACET_TABLE}_company_ai AFTER INSERT ON companies BEGIN {_INDUSTRY.format(names='new.name')} END",
+    f"CREATE TRIGGER IF NOT EXISTS {FACET_TABLE}_company_au AFTER UPDATE OF name, industry ON companies BEGIN {_INDUSTRY.format(names='old.name, new.name')} END",
+    f"CREATE TRIGGER IF NOT EXISTS {FACET_TABLE}_company_ad AFTER DELETE ON companies BEGIN {_INDUSTRY.format(names='old.name')} END",
+]
+
+REBUILD_SQL = [
+    f"DELETE FROM {FACET_TABLE}",
+    f"""INSERT INTO {FACET_TABLE} (company, location, industry, postings)
+        SELECT IFNULL(j.company, ''), IFNULL(j.location, ''), MAX(c.industry), COUNT(*)
+        FROM job_postings j LEFT JOIN companies c ON c.name = j.company
+        GROUP BY IFNULL(j.company, ''), IFNULL(j.location, '')""",
+]
+
+
+def rebuild(conn):
+    """Recount every facet from job_postings, in the caller's transaction."""
+    for statement in REBUILD_SQL:
+        conn.execute(text(statement))
+
+
+# Triggers go in once every table exists (the summary table may be created before
+# job_postings). A summary table created next to existing postings is filled at once.
+@event.listens_for(models.Base.metadata, "after_create")
+def _install(metadata, connection, tables=(), **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    for statement in TRIGGER_DDL:
+        connection.exec_driver_sql(statement)
+    if models.JobPostingFacet.__table__ in tables:
+        rebuild(connection)
+
+
+def _value(column):
+    return func.nullif(column, "")
+
+
+def get_facets(db: Session, filters: dict, limit: int):
+    """Posting counts per value of each facet, for the postings matching every filter.
+
+    filters maps a facet name to the values to accept (any of them); the top
+    `limit` values of each facet are returned, most postings first.
+    """
+    facet = models.JobPostingFacet
+    conditions = [getattr(facet, name).in_(values) for name, values in filters.items() if values]
+    total = db.scalar(select(func.coalesce(func.sum(facet.postings), 0)).where(*conditions))
+    result = {"total": total}
+    for name in FACETS:
+        column = getattr(facet, name)
+        count = func.sum(facet.postings).label("count")
+        rows = db.execute(
+            select(_value(column).label("value"), count).where(*conditions)
+            .group_by(column).order_by(count.desc(), column).limit(limit)
+        )
+        result[name] = [{"value": value, "count": n} for value, n in rows]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="recount the facets from job_postings")
+    args = parser.parse_args()
+    from .database import engine
+
+    if not args.rebuild:
+        parser.print_help()
+        return
+    with engine.begin() as conn:
+        rebuild(conn)
+        rows, postings = conn.execute(text(f"SELECT COUNT(*), IFNULL(SUM(postings), 0) FROM {FACET_TABLE}")).one()
+    print(f"Rebuilt {FACET_TABLE}: {rows} rows, {postings} postings")
+
+
+if __name__ == "__main__":
+    main()
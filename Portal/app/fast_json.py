@@ -0,0 +1,51 @@
+import os
+from functools import lru_cache
+
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: only the FAST_JSON path encodes with it
+    orjson = None
+
+# Opt-in fast path for large list endpoints: select plain column tuples, validate
+# the whole page in one TypeAdapter call and encode it with orjson, instead of
+# loading ORM objects and running jsonable_encoder / response_model per row.
+FAST_JSON = os.getenv("FAST_JSON", "0") == "1"
+if FAST_JSON and orjson is None:
+    raise RuntimeError("FAST_JSON=1 needs orjson: pip install orjson")
+
+
+def _default(obj):
+    # Validated pydantic models are encoded straight from their field values
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_default)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema):
+    return TypeAdapter(list[schema])
+
+
+def schema_columns(model, schema):
+    """The model columns backing each field of `schema`, in field order."""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def list_response(rows, schema, next_cursor=None) -> ORJSONResponse:
+    """Validate a page of Row tuples against `schema` and return it as JSON.
+
+    Columns selected only for pagination (e.g. id) are dropped by validation.
+    The X-Next-Cursor header is set here because a returned Response bypasses
+    the injected one.
+    """
+    items = list_adapter(schema).validate_python([row._asdict() for row in rows])
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor is not None else None
+    return ORJSONResponse(items, headers=headers)
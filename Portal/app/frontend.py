@@ -0,0 +1,143 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from fastapi import HTTPException
+from fastapi.responses import FileResponse, Response
+
+try:
+    import brotli
+except ImportError:  # optional: without it only .br files already in the build are served
+    brotli = None
+
+_logger = logging.getLogger(__name__)
+
+# The built frontend is read into memory once at startup: index.html and every
+# asset are served from there with an ETag, plus gzip / brotli variants made at
+# load time (or taken from .gz / .br files the build already wrote next to them).
+# Files above this size stay on disk and are served as before.
+FRONTEND_MAX_CACHED_FILE = int(os.getenv("FRONTEND_MAX_CACHED_FILE", str(5 * 1024 * 1024)))
+# Smaller files gain too little from compression to be worth a variant
+MIN_COMPRESS_BYTES = 1024
+
+# Vite writes built assets to assets/ as name-<8 base64url chars>.ext, e.g.
+# assets/index-BfX3k2aQ.js: the content hash is in the name, so a URL's bytes
+# never change and browsers may keep them for good. Anything else (index.html,
+# favicon.ico, public/ files such as apple-touch-icon.png) is revalidated.
+_HASHED_NAME = re.compile(r"^assets/(?:[^/]+/)*[^/]+-[A-Za-z0-9_-]{8}\.\w+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+_COMPRESSIBLE = {"application/javascript", "application/json", "application/xml", "image/svg+xml", "application/wasm"}
+
+
+class _Asset:
+    __slots__ = ("path", "body", "variants", "etags", "media_type", "cache_control")
+
+    def __init__(self, path, body, variants, media_type, cache_control):
+        self.path = path
+        self.body = body
+        self.variants = variants  # {"br": bytes, "gzip": bytes}
+        # One ETag per encoding: each variant is a different representation
+        digest = hashlib.sha1(body).hexdigest() if body is not None else None
+        self.etags = {None: f'"{digest}"', **{encoding: f'"{digest}-{encoding}"' for encoding in variants}}
+        self.media_type = media_type
+        self.cache_control = cache_control
+
+
+def _compressible(media_type):
+    return media_type.startswith("text/") or media_type in _COMPRESSIBLE
+
+
+def _variants(path, body, media_type):
+    variants = {}
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if os.path.exists(path + suffix):
+            with open(path + suffix, "rb") as f:
+                variants[encoding] = f.read()
+    if len(body) < MIN_COMPRESS_BYTES or not _compressible(media_type):
+        return variants
+    if "gzip" not in variants:
+        variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+    if "br" not in variants and brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+    # Keep only variants that are actually smaller
+    return {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
+
+
+def _load_asset(path, relative):
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    cache_control = IMMUTABLE if _HASHED_NAME.search(relative) else REVALIDATE
+    if os.path.getsize(path) > FRONTEND_MAX_CACHED_FILE:
+        return _Asset(path, None, {}, media_type, cache_control)
+    with open(path, "rb") as f:
+        body = f.read()
+    return _Asset(path, body, _variants(path, body, media_type), media_type, cache_control)
+
+
+def _accepted(accept_encoding: str):
+    # "gzip, deflate, br;q=0.5" -> {"gzip", "deflate", "br"}; q=0 means "not this one"
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        if name:
+            accepted.add(name.strip())
+    return accepted
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class FrontendBundle:
+    def __init__(self, directory):
+        self.directory = directory
+        self.assets = {}
+
+    def load(self):
+        """Read and index the whole build; call once at startup."""
+        assets = {}
+        if not os.path.isdir(self.directory):
+            _logger.warning("Frontend build %s not found; / and /static will answer 404", self.directory)
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.endswith((".br", ".gz")) and os.path.exists(path[:-3]):
+                    continue  # a precompressed copy, picked up with its original
+                relative = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                assets[relative] = _load_asset(path, relative)
+        self.assets = assets
+        cached = [a for a in assets.values() if a.body is not None]
+        _logger.info("Frontend: %d files, %d KiB in memory", len(assets), sum(len(a.body) for a in cached) // 1024)
+
+    def response(self, relative: str, headers):
+        asset = self.assets.get(relative)
+        if asset is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+        if asset.body is None:
+            return FileResponse(asset.path, media_type=asset.media_type, headers={"Cache-Control": asset.cache_control})
+
+        encoding = None
+        if asset.variants:
+            accepted = _accepted(headers.get("accept-encoding", ""))
+            encoding = next((e for e in ("br", "gzip") if e in accepted and e in asset.variants), None)
+        response_headers = {"ETag": asset.etags[encoding], "Cache-Control": asset.cache_control}
+        if asset.variants:
+            response_headers["Vary"] = "Accept-Encoding"
+        if _etag_matches(headers.get("if-none-match"), asset.etags[encoding]):
+            return Response(status_code=304, headers=response_headers)
+        if encoding is None:
+            return Response(content=asset.body, media_type=asset.media_type, headers=response_headers)
+        response_headers["Content-Encoding"] = encoding
+        return Response(content=asset.variants[encoding], media_type=asset.media_type, headers=response_headers)
+
+    def index(self, headers):
+        return self.response("index.html", headers)
@@ -1,25 +1,38 @@
 import os
+import secrets
 from datetime import timedelta
-from fastapi import FastAPI, Depends, HTTPException, status
+from typing import Literal, Optional
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
-from . import models, schemas, crud, auth
-from .database import SessionLocal, engine 
+from . import models, schemas, crud, crud_async, auth, frontend, search, export, fast_json, slow_queries, facets, changes, autocomplete
+from .database import ASYNC_DB, SessionLocal, async_engine, engine, get_async_db
+from common import metrics
+from common.pagination import AfterParam, LimitParam, set_next_cursor
+from common.schema_check import ensure_schema
+from .password_pool import pool as password_pool
+from .write_queue import WRITE_QUEUE, writer
 
 # Initialize FastAPI
 app = FastAPI()
 
-# Create database tables (AFTER all imports)
-models.Base.metadata.create_all(bind=engine)
+# Create missing tables (AFTER all imports, so the search, facet, change log and autocomplete DDL is registered).
+# A schema fingerprint kept in the database (covering that DDL too) makes this a
+# no-op on every later start, and a file lock lets only one worker create them.
+ensure_schema(engine, models.Base.metadata, extra=[
+    *search.FTS_DDL, *facets.TRIGGER_DDL, *changes.TRIGGER_DDL, *autocomplete.TRIGGER_DDL,
+])
 
 # Set frontend build path
-frontend_build_path = r"C:\Users\Sheraj\Documents\merged folder\HaH_Main\Frontend_code\dist"
+frontend_build_path = os.getenv("FRONTEND_BUILD_PATH", r"C:\Users\Sheraj\Documents\merged folder\HaH_Main\Frontend_code\dist")
 
-# Serve static assets
-app.mount("/static", StaticFiles(directory=frontend_build_path), name="static")
+# The React build is read into memory here, with its gzip / brotli variants;
+# /static and the SPA routes below are served from it, never from disk
+bundle = frontend.FrontendBundle(frontend_build_path)
+bundle.load()
 
 # CORS Middleware for React API calls
 app.add_middleware(
@@ -30,7 +43,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# Per-route latency / size / SQL metrics, exposed at /metrics (added last, so outermost)
+metrics.install_request_metrics(app, engine, async_engine)
+
+# Statements slower than SLOW_QUERY_MS are logged once each, with their query plan
+slow_queries.instrument_engine(engine)
+slow_queries.instrument_engine(async_engine.sync_engine if async_engine is not None else None)
+
+# Committed writes to the change-logged tables wake up /changes long-polls and streams
+changes.notifier.track(engine)
+changes.notifier.track(async_engine.sync_engine if async_engine is not None else None)
+
+# Admin endpoints are disabled (404) unless ADMIN_TOKEN is set; callers send it as X-Admin-Token
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 # Database Dependency
 def get_db():
@@ -40,38 +73,118 @@ def get_db():
     finally:
         db.close()
 
+# The data endpoints below run against the async engine when DB_ASYNC=1, and
+# otherwise call the sync crud functions in the threadpool as before.
+async def run_crud(fn, *args):
+    if ASYNC_DB:
+        return await fn(*args)
+    return await run_in_threadpool(fn, *args)
+
+if ASYNC_DB:
+    store, get_session = crud_async, get_async_db
+else:
+    store, get_session = crud, get_db
+
+@app.on_event("startup")
+def start_password_pool():
+    password_pool.start()
+
+@app.on_event("shutdown")
+def stop_password_pool():
+    password_pool.shutdown()
+
+@app.on_event("startup")
+def build_autocomplete():
+    autocomplete.index.build()
+
+@app.on_event("startup")
+def start_write_queue():
+    if WRITE_QUEUE:
+        writer.start()
+
+@app.on_event("shutdown")
+def stop_write_queue():
+    writer.shutdown()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    if async_engine is not None:
+        await async_engine.dispose()
+
+# Resolve the bearer token to a user. Claims and users are both cached, so in
+# steady state an authenticated request does no JWT decode and no DB query.
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_session)):
+    username = auth.verify_token(token)
+    user = auth.get_cached_user(username)
+    if user is None:
+        db_user = await run_crud(store.get_user_by_username, db, username)
+        if db_user is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        user = auth.cache_user(db_user)
+    return user
+
 # API Endpoints
 @app.post("/companies")
-def create_company(company: schemas.CompanyBase, db: Session = Depends(get_db)):
-    return crud.create_company(db, company)
+async def create_company(company: schemas.CompanyBase, db: Session = Depends(get_session)):
+    # WRITE_QUEUE=1: group-committed by the writer thread (see write_queue.py)
+    if WRITE_QUEUE:
+        return await writer.submit(crud.create_company, company)
+    return await run_crud(store.create_company, db, company)
 
+# With FAST_JSON=1 the two big list endpoints skip ORM objects and per-row encoding (see fast_json.py)
 @app.get("/companies")
-def get_companies(db: Session = Depends(get_db)):
-    return crud.get_companies(db)
+async def get_companies(response: Response, after: Optional[str] = AfterParam, limit: int = LimitParam, db: Session = Depends(get_session)):
+    if fast_json.FAST_JSON:
+        rows, next_cursor = await run_crud(store.get_company_rows, db, after, limit)
+        return fast_json.list_response(rows, schemas.Company, next_cursor)
+    companies, next_cursor = await run_crud(store.get_companies, db, after, limit)
+    set_next_cursor(response, next_cursor)
+    return companies
+
+# Bulk insert-or-update keyed on company name
+@app.put("/companies")
+async def upsert_companies(companies: list[schemas.CompanyBase], db: Session = Depends(get_session)):
+    return await run_crud(store.upsert_companies, db, companies)
 
 @app.post("/pocs")
-def create_poc(poc: schemas.PoCBase, db: Session = Depends(get_db)):
-    return crud.create_poc(db, poc)
+async def create_poc(poc: schemas.PoCBase, db: Session = Depends(get_session)):
+    return await run_crud(store.create_poc, db, poc)
 
 @app.get("/pocs")
-def get_pocs(db: Session = Depends(get_db)):
-    return crud.get_pocs(db)
+async def get_pocs(response: Response, after: Optional[str] = AfterParam, limit: int = LimitParam, db: Session = Depends(get_session)):
+    pocs, next_cursor = await run_crud(store.get_pocs, db, after, limit)
+    set_next_cursor(response, next_cursor)
+    return pocs
+
+# Bulk insert-or-update keyed on PoC email
+@app.put("/pocs")
+async def upsert_pocs(pocs: list[schemas.PoCBase], db: Session = Depends(get_session)):
+    return await run_crud(store.upsert_pocs, db, pocs)
 
 @app.post("/employers")
-def create_employer(employer: schemas.EmployerBase, db: Session = Depends(get_db)):
-    return crud.create_employer(db, employer)
+async def create_employer(employer: schemas.EmployerBase, db: Session = Depends(get_session)):
+    if WRITE_QUEUE:
+        return await writer.submit(crud.create_employer, employer)
+    return await run_crud(store.create_employer, db, employer)
 
 @app.get("/employers")
-def get_employers(db: Session = Depends(get_db)):
-    return crud.get_employers(db)
+async def get_employers(response: Response, after: Optional[str] = AfterParam, limit: int = LimitParam, db: Session = Depends(get_session)):
+    employers, next_cursor = await run_crud(store.get_employers, db, after, limit)
+    set_next_cursor(response, next_cursor)
+    return employers
 
 @app.post("/signup/", response_model=schemas.User)
-def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_username(db, username=user.username)
-    if db_user:
+async def register_user(user: schemas.UserCreate, db: Session = Depends(get_session)):
+    # A taken username or email is turned away before bcrypt runs, with the same
+    # 400 / 409 create_user's insert gives when it loses a race for them.
+    taken = await run_crud(store.taken_user_field, db, user)
+    if taken == "username":
         raise HTTPException(status_code=400, detail="Username already registered")
-    
-    new_user = crud.create_user(db=db, user=user)
+    if taken == "email":
+        raise HTTPException(status_code=409, detail="Email already registered")
+    # bcrypt runs in the password pool; a full queue answers 503 with Retry-After.
+    hashed_password = await password_pool.hash(user.password)
+    new_user = await run_crud(store.create_user, db, user, hashed_password)
     
     return schemas.User(
         id=new_user.id,
@@ -82,9 +195,9 @@ def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     )
 
 @app.post("/login", response_model=schemas.Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = auth.authenticate_user(db, form_data.username, form_data.password)
-    if not user:
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_session)):
+    user = await run_crud(store.get_user_by_username, db, form_data.username)
+    if not user or not await password_pool.verify(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -96,24 +209,118 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
+@app.get("/users/me", response_model=schemas.User)
+async def read_current_user(current_user: schemas.User = Depends(get_current_user)):
+    return current_user
+
 @app.post("/jobpost/", response_model=schemas.JobPosting)
-def create_job_posting(
+async def create_job_posting(
     job: schemas.JobPostingCreate, 
     employer_id: int, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_session)
 ):
-    return crud.create_job_posting(db, job, employer_id)
+    if WRITE_QUEUE:
+        return await writer.submit(crud.create_job_posting, job, employer_id)
+    return await run_crud(store.create_job_posting, db, job, employer_id)
+
+# Full-text search over title, description, company and location, best matches first
+@app.get("/jobpost/search", response_model=list[schemas.JobPosting])
+def search_job_postings(q: str = Query(..., min_length=1), limit: int = LimitParam, db: Session = Depends(get_db)):
+    return search.search_job_postings(db, q, limit)
+
+# Sidebar counts by company, location and industry, from the facet summary table.
+# Repeat a parameter to accept several values (?location=Remote&location=Berlin).
+@app.get("/jobpost/facets", response_model=schemas.JobPostingFacets)
+def get_job_facets(
+    company: Optional[list[str]] = Query(None),
+    location: Optional[list[str]] = Query(None),
+    industry: Optional[list[str]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    return facets.get_facets(db, {"company": company, "location": location, "industry": industry}, limit)
+
+# Search-box suggestions by prefix, most used first, from the in-memory index in autocomplete.py
+@app.get("/autocomplete", response_model=schemas.Autocomplete)
+def get_autocomplete(
+    field: Literal[autocomplete.FIELDS] = Query(...),
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=autocomplete.AUTOCOMPLETE_TOP_K),
+):
+    return {"field": field, "prefix": prefix, "suggestions": autocomplete.index.complete(field, prefix, limit)}
 
 @app.get("/jobpost/employer/{employer_id}", response_model=list[schemas.JobPostingWithoutId])
-def get_jobs_by_employer(employer_id: int, db: Session = Depends(get_db)):
-    return crud.get_jobs_by_employer(db, employer_id)
+async def get_jobs_by_employer(employer_id: int, response: Response, after: Optional[str] = AfterParam, limit: int = LimitParam, db: Session = Depends(get_session)):
+    if fast_json.FAST_JSON:
+        rows, next_cursor = await run_crud(store.get_job_rows_by_employer, db, employer_id, after, limit)
+        return fast_json.list_response(rows, schemas.JobPostingWithoutId, next_cursor)
+    jobs, next_cursor = await run_crud(store.get_jobs_by_employer, db, employer_id, after, limit)
+    set_next_cursor(response, next_cursor)
+    return jobs
 
-@app.get("/")
+# Incremental sync: inserts / updates / deletes of job postings, companies and employers
+# after `since`, oldest first. `wait` holds the request (long-poll) until there is one.
+# A `since` older than the retained log is a 410 (see changes.KEEP_CHANGES).
+@app.get("/changes")
+async def get_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=changes.CHANGES_MAX_BATCH),
+    wait: float = Query(0, ge=0, le=30),
+):
+    return await changes.poll_changes(since, limit, wait)
 
+# The same feed as Server-Sent Events, pushed as changes commit. Last-Event-ID wins over `since`.
+@app.get("/changes/stream")
+async def stream_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=changes.CHANGES_MAX_BATCH),
+    last_event_id: Optional[int] = Header(None),
+):
+    return changes.stream_changes(last_event_id if last_event_id is not None else since, limit)
 
-async def serve_react():
-    return FileResponse(os.path.join(frontend_build_path, "index.html"))
+# Stream a whole table as NDJSON or CSV (optionally gzipped) without loading it into memory
+@app.get("/export/{entity}")
+def export_entity(entity: str, format: Literal["ndjson", "csv"] = "ndjson", gzip: bool = False):
+    return export.export_response(entity, format, gzip)
+
+# Prometheus scrape endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return metrics.render_prometheus()
+
+# Most recent slow statements seen by this worker (the full history is in SLOW_QUERY_LOG)
+@app.get("/admin/slow-queries", dependencies=[Depends(require_admin)])
+def get_slow_queries(limit: int = Query(50, ge=1, le=200)):
+    return {"threshold_ms": slow_queries.SLOW_QUERY_MS, "entries": list(reversed(slow_queries.recent))[:limit]}
+
+# Forget sampled statements so each one is captured again
+@app.delete("/admin/slow-queries", dependencies=[Depends(require_admin)])
+def reset_slow_queries():
+    slow_queries.reset()
+    return {"message": "Slow query samples cleared"}
+
+# Recount the facet summary table from job_postings (drift repair)
+@app.post("/admin/facets/rebuild", dependencies=[Depends(require_admin)])
+def rebuild_job_facets():
+    with engine.begin() as conn:
+        facets.rebuild(conn)
+    return {"message": "Job posting facets rebuilt"}
+
+# Reload the autocomplete index from the tables (this worker only)
+@app.post("/admin/autocomplete/rebuild", dependencies=[Depends(require_admin)])
+def rebuild_autocomplete():
+    autocomplete.index.build()
+    return {"message": "Autocomplete index rebuilt"}
+
+# Serve static assets: hashed names are cached for good, the rest revalidate by ETag
+@app.get("/static/{path:path}")
+async def serve_static(path: str, request: Request):
+    return bundle.response(path, request.headers)
+
+@app.get("/")
+async def serve_react(request: Request):
+    return bundle.index(request.headers)
 
 @app.get("/{full_path:path}")
-async def catch_all(full_path: str):
-    return FileResponse(os.path.join(frontend_build_path, "index.html"))
+async def catch_all(full_path: str, request: Request):
+    return bundle.index(request.headers)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, Text, DateTime, ForeignKey,CheckConstraint,Table
+from sqlalchemy import Column, Integer, String, Enum, Text, DateTime, ForeignKey,CheckConstraint,Index,Table,func
 from sqlalchemy.orm import relationship
 from .database import Base
 import enum
@@ -46,13 +46,56 @@ class JobPosting(Base):
     posted_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     employer_id = Column(Integer, ForeignKey("users.id"))
 
+    # Relationship to User (the posting employer)
+    employer = relationship("User", back_populates="jobs")
+
+    __table_args__ = (
+        # One posting per title per employer (crud.create_job_posting's duplicate check)
+        Index("uq_job_postings_employer_title", "employer_id", "title", unique=True),
+        # get_jobs_by_employer: filter on employer_id, newest first by (posted_at, id)
+        Index("ix_job_postings_employer_posted_at", "employer_id", "posted_at"),
+    )
+
+# Posting counts per (company, location), kept current by the triggers in facets.py.
+# industry is the company's; '' stands for a posting without company or location.
+class JobPostingFacet(Base):
+    __tablename__ = "job_posting_facets"
+    company = Column(String(255), primary_key=True)
+    location = Column(String(255), primary_key=True)
+    industry = Column(String(255), nullable=True)
+    postings = Column(Integer, nullable=False, default=0)
+
+# Append-only feed of inserts / updates / deletes, written by the triggers in changes.py
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    seq = Column(Integer, primary_key=True)
+    entity = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(10), nullable=False)
+    changed_at = Column(DateTime, nullable=False, server_default=func.current_timestamp())
+
+    # AUTOINCREMENT: a seq is never handed out twice, even after old rows are deleted
+    __table_args__ = {"sqlite_autoincrement": True}
+
+# +1 / -1 per autocomplete term on every write to its source columns, written by
+# the triggers in autocomplete.py; each worker replays it into its in-memory index
+class AutocompleteChange(Base):
+    __tablename__ = "autocomplete_changes"
+    seq = Column(Integer, primary_key=True)
+    field = Column(String(20), nullable=False)
+    term = Column(String, nullable=False)
+    delta = Column(Integer, nullable=False)
+
+    __table_args__ = {"sqlite_autoincrement": True}
 
     # Association Table for Many-to-Many Relationship
 employer_poc_association = Table(
     "employer_poc_association",
     Base.metadata,
     Column("employer_id", Integer, ForeignKey("employers.id"), primary_key=True),
-    Column("poc_id", Integer, ForeignKey("pocs.id"), primary_key=True)
+    Column("poc_id", Integer, ForeignKey("pocs.id"), primary_key=True),
+    # The primary key covers lookups by employer; this one serves "employers of a PoC"
+    Index("ix_employer_poc_association_poc_id", "poc_id"),
 )
 
 
@@ -102,3 +145,7 @@ class PointOfContact(Base):
 
  # Many-to-Many Relationship with Employers
     employers = relationship("Employer", secondary=employer_poc_association, back_populates="pocs")
+
+
+# Registers the FTS5 index DDL on job_postings (see search.py)
+from . import search  # noqa: E402,F401
@@ -0,0 +1,114 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from common.metrics import Counter, Gauge, Histogram
+
+# bcrypt runs in a dedicated process pool so a login burst neither blocks the
+# event loop nor starves the threadpool that every other endpoint shares.
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", str(os.cpu_count() or 2)))
+# Hashes allowed to wait for a worker; anything beyond is rejected with 503
+PASSWORD_POOL_MAX_QUEUE = int(os.getenv("PASSWORD_POOL_MAX_QUEUE", "32"))
+PASSWORD_POOL_RETRY_AFTER = os.getenv("PASSWORD_POOL_RETRY_AFTER", "1")
+
+_pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+queue_wait_seconds = Histogram("password_pool_queue_wait_seconds", "Time a password job waited for a pool worker", ["op"], HASH_BUCKETS)
+hash_seconds = Histogram("password_pool_hash_seconds", "Time a pool worker spent in bcrypt", ["op"], HASH_BUCKETS)
+in_flight = Gauge("password_pool_in_flight", "Password jobs queued or running in the pool")
+rejected_total = Counter("password_pool_rejected_total", "Password jobs rejected because the queue was full", ["op"])
+
+
+# These run inside the worker processes. They report their own start time and
+# duration so the parent can split queue wait from bcrypt time.
+def _hash_job(password):
+    started = time.time()
+    result = _pwd_context.hash(password)
+    return result, started, time.time() - started
+
+
+def _verify_job(plain_password, hashed_password):
+    started = time.time()
+    result = _pwd_context.verify(plain_password, hashed_password)
+    return result, started, time.time() - started
+
+
+def _warm_up():
+    return None
+
+
+class PasswordPool:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Started lazily so imports (alembic, scripts) never spawn processes.
+        # "spawn" avoids forking a process that already runs server threads.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def start(self):
+        # Spawn every worker up front so the first logins do not pay for process start-up
+        with self._lock:
+            executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(_warm_up)
+
+    def _submit(self, op, job, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                rejected_total.inc(op)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication is busy, please retry",
+                    headers={"Retry-After": PASSWORD_POOL_RETRY_AFTER},
+                )
+            self._pending += 1
+            executor = self._get_executor()
+        in_flight.inc()
+        submitted = time.time()
+        future = executor.submit(job, *args)
+
+        def _done(f):
+            with self._lock:
+                self._pending -= 1
+            in_flight.dec()
+            if not f.cancelled() and f.exception() is None:
+                _, started, duration = f.result()
+                queue_wait_seconds.observe(max(started - submitted, 0.0), op)
+                hash_seconds.observe(duration, op)
+
+        future.add_done_callback(_done)
+        return future
+
+    # Async API, for endpoints: awaits the worker without holding a thread
+    async def hash(self, password: str) -> str:
+        return (await asyncio.wrap_future(self._submit("hash", _hash_job, password)))[0]
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return (await asyncio.wrap_future(self._submit("verify", _verify_job, plain_password, hashed_password)))[0]
+
+    # Blocking API, for sync code that already runs in a worker thread
+    def hash_sync(self, password: str) -> str:
+        return self._submit("hash", _hash_job, password).result()[0]
+
+    def verify_sync(self, plain_password: str, hashed_password: str) -> bool:
+        return self._submit("verify", _verify_job, plain_password, hashed_password).result()[0]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+pool = PasswordPool(PASSWORD_POOL_WORKERS, PASSWORD_POOL_MAX_QUEUE)
@@ -44,6 +44,21 @@ class CompanyBase(BaseModel):
     established: int
 
 
+class Company(BaseModel):
+    id: int
+    name: str
+    industry: Optional[str] = None
+    about: Optional[str] = None
+    website: Optional[str] = None
+    email: str
+    phone: Optional[str] = None
+    location: Optional[str] = None
+    established: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
 # Point-of-Contact Schema
 class PoCBase(BaseModel):
     name: str
@@ -86,6 +101,30 @@ class JobPostingWithoutId(JobPostingBase):
     posted_at: datetime.datetime
 
 
+# Facet Schemas (None is a posting without that company / location / known industry)
+class FacetCount(BaseModel):
+    value: Optional[str]
+    count: int
+
+
+class JobPostingFacets(BaseModel):
+    total: int
+    company: List[FacetCount]
+    location: List[FacetCount]
+    industry: List[FacetCount]
+
+
+class Suggestion(BaseModel):
+    value: str
+    count: int
+
+
+class Autocomplete(BaseModel):
+    field: str
+    prefix: str
+    suggestions: List[Suggestion]
+
+
 # Token Schema
 class Token(BaseModel):
     access_token: str
@@ -0,0 +1,84 @@
+import re
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from . import models
+
+# Full-text index over job postings (SQLite FTS5, external content table).
+# The index only stores tokens; rows are read back from job_postings by rowid.
+FTS_TABLE = "job_postings_fts"
+FTS_COLUMNS = ("title", "description", "company", "location")
+
+_cols = ", ".join(FTS_COLUMNS)
+_new = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+_old = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+
+FTS_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({_cols}, content='job_postings', content_rowid='id')",
+    # Triggers keep the index in step with every INSERT / UPDATE / DELETE, ORM or not
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON job_postings BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_cols}) VALUES (new.id, {_new});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON job_postings BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_cols}) VALUES ('delete', old.id, {_old});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON job_postings BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_cols}) VALUES ('delete', old.id, {_old});
+        INSERT INTO {FTS_TABLE}(rowid, {_cols}) VALUES (new.id, {_new});
+    END""",
+]
+
+
+@event.listens_for(models.Base.metadata, "after_create")
+def _install(metadata, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    exists = connection.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLE,)).first()
+    for statement in FTS_DDL:
+        connection.exec_driver_sql(statement)
+    if exists is None:
+        # A database from before the index: index the postings it already has
+        backfill(connection)
+
+
+# Postings copied into a new index per statement, so the backfill never holds the whole table in memory
+BACKFILL_CHUNK = 5000
+_CHUNK_END_SQL = "SELECT MAX(id) FROM (SELECT id FROM job_postings WHERE id > ? ORDER BY id LIMIT ?)"
+_BACKFILL_SQL = f"INSERT INTO {FTS_TABLE}(rowid, {_cols}) SELECT id, {_cols} FROM job_postings WHERE id > ? AND id <= ?"
+
+
+def backfill(connection, chunk: int = BACKFILL_CHUNK):
+    """Index the existing postings in id order, `chunk` rows per statement."""
+    last_id = 0
+    while True:
+        max_id = connection.exec_driver_sql(_CHUNK_END_SQL, (last_id, chunk)).scalar()
+        if max_id is None:
+            return
+        connection.exec_driver_sql(_BACKFILL_SQL, (last_id, max_id))
+        last_id = max_id
+
+
+_SEARCH_SQL = text(f"""
+    SELECT job_postings.* FROM {FTS_TABLE}
+    JOIN job_postings ON job_postings.id = {FTS_TABLE}.rowid
+    WHERE {FTS_TABLE} MATCH :query
+    ORDER BY bm25({FTS_TABLE})
+    LIMIT :limit
+""")
+
+
+def to_match_query(q: str):
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix."""
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_job_postings(db: Session, q: str, limit: int):
+    query = to_match_query(q)
+    if query is None:
+        return []
+    stmt = _SEARCH_SQL.bindparams(query=query, limit=limit)
+    return db.query(models.JobPosting).from_statement(stmt).all()
@@ -0,0 +1,116 @@
+import collections
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import re
+import threading
+import time
+
+from sqlalchemy import event
+
+from common.metrics import current_route
+
+# Statements slower than this are recorded (once per distinct statement)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "slow_queries.jsonl")
+SLOW_QUERY_LOG_BYTES = int(os.getenv("SLOW_QUERY_LOG_BYTES", str(5 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "3"))
+# Distinct statements remembered as already sampled; past this, new ones are still logged
+MAX_SAMPLED = 10000
+
+# Recent entries kept in memory for GET /admin/slow-queries
+recent = collections.deque(maxlen=200)
+
+_sampled = set()
+_lock = threading.Lock()
+# Expanded IN lists ("IN (?, ?, ?)") differ only in length; sample them as one statement
+_IN_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+
+_logger = logging.getLogger("portal.slow_queries")
+_logger.propagate = False
+
+
+def _open_log():
+    if _logger.handlers or not SLOW_QUERY_LOG:
+        return
+    handler = logging.handlers.RotatingFileHandler(
+        SLOW_QUERY_LOG, maxBytes=SLOW_QUERY_LOG_BYTES, backupCount=SLOW_QUERY_LOG_BACKUPS, encoding="utf-8"
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _logger.addHandler(handler)
+    _logger.setLevel(logging.INFO)
+
+
+def _shape(value):
+    # Types only: bound values may be passwords, emails, tokens...
+    if isinstance(value, dict):
+        return {k: type(v).__name__ for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [type(v).__name__ for v in value]
+    return type(value).__name__
+
+
+def _first_sample(statement):
+    key = _IN_LIST.sub("(?...)", statement)
+    with _lock:
+        if key in _sampled:
+            return False
+        if len(_sampled) < MAX_SAMPLED:
+            _sampled.add(key)
+        return True
+
+
+def _explain(conn, statement, parameters):
+    if conn.dialect.name != "sqlite":
+        return None
+    # Separate cursor: the original one still holds the statement's result rows
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as exc:  # the plan is best effort, never fail the query
+        return [f"EXPLAIN failed: {exc}"]
+    finally:
+        cursor.close()
+
+
+def instrument_engine(engine):
+    """Record statements on `engine` that take longer than SLOW_QUERY_MS."""
+    if engine is None:
+        return
+    _open_log()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._slow_query_started) * 1000
+        if elapsed_ms < SLOW_QUERY_MS or not _first_sample(statement):
+            return
+        if executemany:
+            shapes = {"rows": len(parameters), "row": _shape(parameters[0]) if parameters else None}
+            plan_parameters = parameters[0] if parameters else ()
+        else:
+            shapes = _shape(parameters)
+            plan_parameters = parameters
+        entry = {
+            "at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "duration_ms": round(elapsed_ms, 2),
+            "route": current_route(),
+            "statement": statement,
+            "parameters": shapes,
+            "plan": _explain(conn, statement, plan_parameters),
+        }
+        recent.append(entry)
+        _logger.info(json.dumps(entry, default=str))
+
+
+def reset():
+    """Forget which statements were sampled, so each is captured again."""
+    with _lock:
+        _sampled.clear()
+    recent.clear()
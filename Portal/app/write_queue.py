@@ -0,0 +1,153 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from .database import engine
+from common.metrics import Counter, Gauge, Histogram
+from common.upsert import unique_violation
+
+# WRITE_QUEUE=1 sends the create endpoints' writes to one writer thread instead of
+# committing each in its own request. The writer takes what is queued (up to
+# WRITE_QUEUE_BATCH writes, waiting at most WRITE_QUEUE_WAIT_MS for more) and
+# commits it as one transaction, so a burst of N writes costs one write lock and
+# one fsync per batch rather than N lock handoffs that can end in "database is locked".
+WRITE_QUEUE = os.getenv("WRITE_QUEUE", "0") == "1"
+WRITE_QUEUE_BATCH = int(os.getenv("WRITE_QUEUE_BATCH", "64"))
+WRITE_QUEUE_WAIT_MS = float(os.getenv("WRITE_QUEUE_WAIT_MS", "2"))
+# Writes allowed to wait for the writer; anything beyond is rejected with 503
+WRITE_QUEUE_MAX = int(os.getenv("WRITE_QUEUE_MAX", "1000"))
+WRITE_QUEUE_RETRY_AFTER = os.getenv("WRITE_QUEUE_RETRY_AFTER", "1")
+
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+batch_size = Histogram("write_queue_batch_size", "Writes committed together in one transaction", buckets=BATCH_BUCKETS)
+queue_wait_seconds = Histogram("write_queue_wait_seconds", "Time a write waited for the writer", buckets=LATENCY_BUCKETS)
+commit_seconds = Histogram("write_queue_batch_seconds", "Time the writer spent on one batch, commit included", buckets=LATENCY_BUCKETS)
+pending = Gauge("write_queue_pending", "Writes queued or being written")
+rejected_total = Counter("write_queue_rejected_total", "Writes rejected because the queue was full")
+
+
+class _Write:
+    __slots__ = ("fn", "args", "future", "queued_at")
+
+    def __init__(self, fn, args):
+        self.fn = fn
+        self.args = args
+        self.future = Future()
+        self.queued_at = time.perf_counter()
+
+
+class WriteQueue:
+    def __init__(self, engine, batch: int, wait_ms: float, max_queue: int):
+        self.engine = engine
+        self.batch = batch
+        self.wait = wait_ms / 1000
+        self._queue = queue.Queue(max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+                self._thread.start()
+
+    def shutdown(self):
+        # Writes already queued are still committed
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    async def submit(self, fn, *args):
+        """Run fn(db, *args) in the writer's next batch; returns its result or raises its error.
+
+        fn is a sync crud function. It runs in a Session of its own inside a
+        SAVEPOINT, so its commit() releases the savepoint and its rollback()
+        undoes only its own writes; the batch is committed once all have run.
+        """
+        self.start()
+        write = _Write(fn, args)
+        try:
+            self._queue.put_nowait(write)
+        except queue.Full:
+            rejected_total.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many writes in progress, please retry",
+                headers={"Retry-After": WRITE_QUEUE_RETRY_AFTER},
+            )
+        pending.inc()
+        try:
+            return await asyncio.wrap_future(write.future)
+        finally:
+            pending.dec()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                return
+            writes = [first]
+            deadline = time.perf_counter() + self.wait
+            while len(writes) < self.batch:
+                try:
+                    write = self._queue.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if write is None:
+                    stopping = True
+                    break
+                writes.append(write)
+            self._write_batch(writes)
+
+    def _write_batch(self, writes):
+        started = time.perf_counter()
+        for write in writes:
+            queue_wait_seconds.observe(started - write.queued_at)
+        outcomes = []
+        try:
+            with self.engine.connect() as conn:
+                with conn.begin():
+                    if conn.dialect.name == "sqlite":
+                        # Take the write lock up front: a deferred transaction that has
+                        # read first fails to upgrade with "database is locked" at once
+                        conn.exec_driver_sql("BEGIN IMMEDIATE")
+                    for write in writes:
+                        outcomes.append(self._apply(conn, write))
+        except Exception as exc:  # the batch did not commit, so nothing in it happened
+            for write in writes:
+                write.future.set_exception(exc)
+            return
+        finally:
+            batch_size.observe(len(writes))
+            commit_seconds.observe(time.perf_counter() - started)
+        # Callers only hear back once their write is committed
+        for write, (ok, value) in zip(writes, outcomes):
+            if ok:
+                write.future.set_result(value)
+            else:
+                write.future.set_exception(value)
+
+    def _apply(self, conn, write):
+        with Session(bind=conn, join_transaction_mode="create_savepoint", autoflush=False, expire_on_commit=False) as db:
+            try:
+                return True, write.fn(db, *write.args)
+            except IntegrityError as exc:
+                db.rollback()
+                if not unique_violation(exc):
+                    return False, exc
+                return False, HTTPException(status_code=409, detail="Conflicts with an existing record")
+            except Exception as exc:
+                db.rollback()
+                return False, exc
+
+
+writer = WriteQueue(engine, WRITE_QUEUE_BATCH, WRITE_QUEUE_WAIT_MS, WRITE_QUEUE_MAX)
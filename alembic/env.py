@@ -1,5 +1,4 @@
 from logging.config import fileConfig
-from main import Base 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
@@ -11,14 +10,24 @@ config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+# Not when main.py migrates at startup (it passes a connection): that would
+# replace the server's logging setup.
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-target_metadata = Base.metadata
+if "target_metadata" in config.attributes:
+    target_metadata = config.attributes["target_metadata"]
+else:
+    # Run from the alembic CLI: importing main must not start a migration of its own
+    from common.schema_check import skipping_schema_check
+
+    with skipping_schema_check():
+        from main import Base
+    target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -57,6 +66,14 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        # Called from main.create_database() with the connection it holds the schema lock on
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -70,6 +87,10 @@ def run_migrations_online() -> None:
 
         with context.begin_transaction():
             context.run_migrations()
+            # The schema may no longer match the fingerprint main.py recorded; clear it
+            # so the next app start checks again
+            if connection.dialect.name == "sqlite":
+                connection.exec_driver_sql("PRAGMA user_version = 0")
 
 
 if context.is_offline_mode():
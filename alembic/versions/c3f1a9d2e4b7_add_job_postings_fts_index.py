@@ -0,0 +1,79 @@
+"""Add FTS5 full-text index over job postings
+
+Revision ID: c3f1a9d2e4b7
+Revises: 7b5100084ce1
+Create Date: 2026-10-16 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f1a9d2e4b7'
+down_revision: Union[str, None] = '7b5100084ce1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FTS_TABLE = 'job_postings_fts'
+# Rows are copied into the index this many at a time so the backfill never
+# holds the whole table in memory.
+BACKFILL_CHUNK = 5000
+
+
+def _indexed_columns(bind):
+    # The Portal schema has all four columns, the main12 schema has no location.
+    inspector = sa.inspect(bind)
+    if 'job_postings' not in inspector.get_table_names():
+        return []
+    existing = {c['name'] for c in inspector.get_columns('job_postings')}
+    return [c for c in ('title', 'description', 'company', 'location') if c in existing]
+
+
+def upgrade() :
+    bind = op.get_bind()
+    columns = _indexed_columns(bind)
+    if bind.dialect.name != 'sqlite' or not columns:
+        return
+
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{c}' for c in columns)
+    old = ', '.join(f'old.{c}' for c in columns)
+
+    op.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({cols}, content='job_postings', content_rowid='id')")
+    op.execute(f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON job_postings BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.id, {new});
+    END""")
+    op.execute(f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON job_postings BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.id, {old});
+    END""")
+    op.execute(f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON job_postings BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.id, {old});
+        INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.id, {new});
+    END""")
+
+    # Backfill existing rows in id order, one chunk per statement
+    last_id = 0
+    while True:
+        max_id = bind.execute(
+            sa.text("SELECT MAX(id) FROM (SELECT id FROM job_postings WHERE id > :last_id ORDER BY id LIMIT :chunk)"),
+            {'last_id': last_id, 'chunk': BACKFILL_CHUNK},
+        ).scalar()
+        if max_id is None:
+            break
+        bind.execute(
+            sa.text(f"INSERT INTO {FTS_TABLE}(rowid, {cols}) SELECT id, {cols} FROM job_postings WHERE id > :last_id AND id <= :max_id"),
+            {'last_id': last_id, 'max_id': max_id},
+        )
+        last_id = max_id
+
+
+def downgrade() :
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    for suffix in ('ai', 'ad', 'au'):
+        op.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+    op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
@@ -0,0 +1,56 @@
+"""Add indexes for job posting and PoC access patterns
+
+Revision ID: d5b7e9a1c2f4
+Revises: c3f1a9d2e4b7
+Create Date: 2026-10-16 23:40:12.527093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b7e9a1c2f4'
+down_revision: Union[str, None] = 'c3f1a9d2e4b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, unique). Only created where the table has the columns:
+# job_postings.employer_id exists in the Portal schema but not in main12's.
+INDEXES = [
+    ('uq_job_postings_employer_title', 'job_postings', ['employer_id', 'title'], True),
+    ('ix_job_postings_employer_posted_at', 'job_postings', ['employer_id', 'posted_at'], False),
+    ('ix_employer_poc_association_poc_id', 'employer_poc_association', ['poc_id'], False),
+]
+
+
+def _applicable(bind):
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    for name, table, columns, unique in INDEXES:
+        if table in tables and set(columns) <= {c['name'] for c in inspector.get_columns(table)}:
+            yield name, table, columns, unique
+
+
+def upgrade() :
+    bind = op.get_bind()
+    for name, table, columns, unique in _applicable(bind):
+        if unique:
+            duplicates = bind.execute(sa.text(
+                f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE {' AND '.join(f'{c} IS NOT NULL' for c in columns)} "
+                f"GROUP BY {', '.join(columns)} HAVING COUNT(*) > 1)"
+            )).scalar()
+            if duplicates:
+                raise RuntimeError(
+                    f"{duplicates} duplicate ({', '.join(columns)}) groups in {table}; "
+                    f"remove them before adding unique index {name}"
+                )
+        op.create_index(name, table, columns, unique=unique, if_not_exists=True)
+
+
+def downgrade() :
+    bind = op.get_bind()
+    for name, table, columns, unique in _applicable(bind):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,109 @@
+"""Latency and memory of the Portal's GET /autocomplete prefix index.
+
+The Portal is seeded with benchmarks.datagen (1m: one million postings, every
+title distinct), then the index is built as at startup. Lookups replay typing:
+every prefix of --terms random existing terms, once with cold prefix caches and
+once again warm. Writes are timed as insert + the next lookup's catch-up.
+
+    python -m benchmarks.autocomplete --scale 1m --terms 2000
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+from benchmarks import datagen
+from benchmarks.load import LOADERS, run_isolated
+
+
+def _percentiles(timings):
+    timings = sorted(timings)
+    return {
+        "lookups": len(timings),
+        "p50_us": round(statistics.median(timings) * 1e6, 1),
+        "p99_us": round(timings[int(len(timings) * 0.99) - 1] * 1e6, 1),
+        "max_us": round(timings[-1] * 1e6, 1),
+    }
+
+
+def _bench(scale, n_terms, seed):
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+
+    app, engines, metadata, _ = LOADERS["portal"]()
+    from app import autocomplete
+
+    started = time.perf_counter()
+    rows = datagen.seed(engines[0], metadata, scale, seed)
+    seed_seconds = time.perf_counter() - started
+
+    index = autocomplete.index
+    tracemalloc.start()
+    started = time.perf_counter()
+    index.build()
+    build_seconds = time.perf_counter() - started
+    memory_mb = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+
+    rng = random.Random(seed)
+    typed = []
+    for field, prefix_index in index.indexes.items():
+        keys = prefix_index._keys
+        for key in rng.sample(keys, min(n_terms, len(keys))):
+            typed += [(field, key[:end]) for end in range(1, min(len(key), 12) + 1)]
+    rng.shuffle(typed)
+
+    report = {"scale": scale, "rows": rows, "seed_seconds": round(seed_seconds, 1), "build_seconds": round(build_seconds, 2),
+              "index_memory_mb": round(memory_mb, 1), "terms": {field: len(i) for field, i in index.indexes.items()}}
+    for label in ("cold", "warm"):
+        timings = []
+        for field, prefix in typed:
+            started = time.perf_counter()
+            index.complete(field, prefix, 10)
+            timings.append(time.perf_counter() - started)
+        report[f"lookup_{label}"] = _percentiles(timings)
+
+    with TestClient(app) as client:
+        timings = []
+        for field, prefix in typed[:2000]:
+            started = time.perf_counter()
+            response = client.get("/autocomplete", params={"field": field, "prefix": prefix})
+            timings.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.text
+        report["http_warm"] = _percentiles(timings)
+
+        timings = []
+        for i in range(200):
+            with engines[0].begin() as conn:
+                conn.execute(text(
+                    "INSERT INTO job_postings (title, description, company, location, employer_id) "
+                    "VALUES (:title, 'd', 'Company 1', 'Remote', 1)"
+                ), {"title": f"Autocomplete Bench {i}"})
+            started = time.perf_counter()
+            found = index.complete("title", f"autocomplete bench {i}", 1)
+            timings.append(time.perf_counter() - started)
+            assert found and found[0]["value"] == f"Autocomplete Bench {i}", found
+        report["lookup_after_insert"] = _percentiles(timings)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="1m")
+    parser.add_argument("--terms", type=int, default=2000, help="random terms per field whose prefixes are looked up")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    report = run_isolated(_bench, datagen.parse_scale(args.scale), args.terms, args.seed)
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Set-based bulk deletes vs deleting one ORM object per request.
+
+main12: job postings older than a cutoff (half of --rows) are deleted with one
+DELETE /job-postings?posted_before= request. main: --rows employers spread over
+--companies companies, two PoC links each; one company's employers are deleted
+with DELETE /companies/{company_id}/employers.
+
+The old per-row path (SELECT the object, db.delete() it, commit) is timed on
+--sample rows that the bulk delete does not touch, and extrapolated to the
+number of rows the bulk delete removed.
+
+    python -m benchmarks.bulk_delete --rows 100000 --sample 500
+"""
+import argparse
+import datetime
+import json
+import random
+import time
+
+from benchmarks import datagen
+from benchmarks.load import run_isolated
+
+
+def _per_row(SessionLocal, model, ids):
+    # What the single-row DELETE endpoints did before: load, db.delete(), commit
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        for row_id in ids:
+            db.delete(db.query(model).filter(model.id == row_id).first())
+            db.commit()
+    return time.perf_counter() - started
+
+
+def _report(deleted, bulk_seconds, sample, sample_seconds):
+    per_row_ms = sample_seconds / sample * 1000
+    return {
+        "deleted": deleted,
+        "bulk_seconds": round(bulk_seconds, 3),
+        "per_row_ms": round(per_row_ms, 3),
+        "per_row_seconds_extrapolated": round(per_row_ms * deleted / 1000, 1),
+        "speedup": round(per_row_ms * deleted / 1000 / bulk_seconds, 1),
+    }
+
+
+def _bench_main12(rows, sample, seed):
+    from fastapi.testclient import TestClient
+    import database
+    import main12
+
+    datagen.seed(database.engine, database.Base.metadata, rows, seed)
+    cutoff = datagen.EPOCH + datetime.timedelta(minutes=rows // 2)
+    # The newest rows, which the cutoff keeps
+    sample_seconds = _per_row(database.SessionLocal, database.JobPosting, range(rows, rows - sample, -1))
+
+    client = TestClient(main12.app)
+    started = time.perf_counter()
+    response = client.delete("/job-postings", params={"posted_before": cutoff.isoformat()})
+    bulk_seconds = time.perf_counter() - started
+    assert response.status_code == 200, response.text
+    return _report(response.json()["deleted"], bulk_seconds, sample, sample_seconds)
+
+
+def _bench_main(rows, companies, sample, seed):
+    from fastapi.testclient import TestClient
+    import main
+
+    rng = random.Random(seed)
+    n_pocs = max(rows // 100, 10)
+    with main.engine.begin() as conn:
+        conn.execute(main.Company.__table__.insert(), list(datagen.companies(companies, rng)))
+        conn.execute(main.PointOfContact.__table__.insert(), list(datagen.pocs(n_pocs, rng)))
+        conn.execute(main.Employer.__table__.insert(), [
+            {**employer, "company_id": employer["id"] % companies + 1}
+            for employer in datagen.employers(rows, companies, rng)
+        ])
+        conn.execute(main.employer_poc_association.insert(), list(datagen.employer_pocs(rows, n_pocs, rng)))
+        # Employers of company 1, which the bulk delete (company 2) keeps
+        sample_ids = [i for i in range(companies, rows + 1, companies)][:sample]
+
+    sample_seconds = _per_row(main.SessionLocal, main.Employer, sample_ids)
+
+    client = TestClient(main.app)
+    started = time.perf_counter()
+    response = client.delete("/companies/2/employers")
+    bulk_seconds = time.perf_counter() - started
+    assert response.status_code == 200, response.text
+    result = _report(response.json()["employers_deleted"], bulk_seconds, len(sample_ids), sample_seconds)
+    result["poc_links_deleted"] = response.json()["poc_links_deleted"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="job postings (main12) and employers (main)")
+    parser.add_argument("--companies", type=int, default=4, help="companies the employers are spread over")
+    parser.add_argument("--sample", type=int, default=500, help="rows deleted one by one to time the per-row path")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    report = {
+        "rows": args.rows,
+        "results": {
+            "main12 DELETE /job-postings?posted_before=": run_isolated(_bench_main12, args.rows, args.sample, args.seed),
+            "main DELETE /companies/{company_id}/employers": run_isolated(
+                _bench_main, args.rows, args.companies, args.sample, args.seed
+            ),
+        },
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
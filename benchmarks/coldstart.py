@@ -0,0 +1,143 @@
+"""Cold start of main.py, main12.py and the Portal app.
+
+Every start is a new interpreter in a temporary working directory, timed from
+process launch to the first response. Three cases per app:
+
+    fresh     empty directory: the schema is created
+    restart   the same directory again: the schema is current, startup only checks it
+    workers   --workers processes started at once on an empty directory, as
+              `uvicorn --workers N` does; exactly one of them should migrate
+
+Each start reports the import time of the app module, the time to the first
+response (lifespan startup plus one GET /metrics) and whether it migrated.
+
+    python -m benchmarks.coldstart --apps main,main12,portal --workers 4 --repeat 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.load import PORTAL_DIR, REPO_DIR
+
+# Runs in the child interpreter; nothing is imported before the clock starts but the stdlib
+CHILD = r"""
+import json, logging, os, sys, time
+began = time.perf_counter()
+migrated = []
+
+class _Migrations(logging.Handler):
+    def emit(self, record):
+        if record.name.endswith("schema_check"):
+            migrated.append(record.getMessage())
+
+logging.getLogger().addHandler(_Migrations())
+logging.getLogger().setLevel(logging.INFO)
+
+import importlib
+app = importlib.import_module({module!r}).app
+imported = time.perf_counter()
+
+import asyncio, httpx
+
+async def first_response():
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return (await client.get("/metrics")).status_code
+
+status = asyncio.run(first_response())
+print(json.dumps({{
+    "import_ms": round((imported - began) * 1000, 1),
+    "ready_ms": round((time.perf_counter() - began) * 1000, 1),
+    "status": status,
+    "migrated": bool(migrated),
+}}))
+"""
+
+APPS = {
+    "main": {"module": "main", "path": REPO_DIR, "env": {}},
+    "main12": {"module": "main12", "path": REPO_DIR, "env": {}},
+    "portal": {"module": "app.main", "path": PORTAL_DIR, "env": {"DATABASE_URL": "sqlite:///./portal.db"}},
+}
+
+
+def _launch(name, cwd):
+    app = APPS[name]
+    code = CHILD.format(module=app["module"])
+    env = {**os.environ, **app["env"], "PYTHONPATH": app["path"]}
+    if name == "portal":
+        # An empty build in the run's own directory instead of the default (a Windows path)
+        env["FRONTEND_BUILD_PATH"] = os.path.join(cwd, "frontend")
+        os.makedirs(env["FRONTEND_BUILD_PATH"], exist_ok=True)
+    return subprocess.Popen(
+        [sys.executable, "-c", code], cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    ), time.perf_counter()
+
+
+def _collect(process, launched):
+    stdout, stderr = process.communicate()
+    wall_ms = round((time.perf_counter() - launched) * 1000, 1)
+    if process.returncode != 0:
+        return {"error": stderr.strip().splitlines()[-1] if stderr.strip() else f"exit {process.returncode}", "wall_ms": wall_ms}
+    return {**json.loads(stdout.strip().splitlines()[-1]), "wall_ms": wall_ms}
+
+
+def _start(name, cwd):
+    return _collect(*_launch(name, cwd))
+
+
+def _start_together(name, cwd, workers):
+    launched = [_launch(name, cwd) for _ in range(workers)]
+    return [_collect(*pair) for pair in launched]
+
+
+def _summary(starts):
+    ok = [s for s in starts if "error" not in s]
+    summary = {"starts": len(starts), "errors": [s["error"] for s in starts if "error" in s]}
+    for key in ("import_ms", "ready_ms", "wall_ms"):
+        if ok:
+            summary[key] = round(statistics.median(s[key] for s in ok), 1)
+    summary["migrated"] = sum(s.get("migrated", False) for s in ok)
+    return summary
+
+
+def bench_app(name, workers, repeat):
+    fresh, restart, together = [], [], []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            fresh.append(_start(name, tmp))
+            restart.append(_start(name, tmp))
+        with tempfile.TemporaryDirectory() as tmp:
+            together.extend(_start_together(name, tmp, workers))
+    workers_summary = _summary(together)
+    workers_summary["migrated_per_round"] = workers_summary["migrated"] / repeat
+    return {"fresh": _summary(fresh), "restart": _summary(restart), "workers": workers_summary}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", default="main,main12,portal")
+    parser.add_argument("--workers", type=int, default=4, help="processes started at once in the workers case")
+    parser.add_argument("--repeat", type=int, default=3, help="rounds per case; medians are reported")
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    report = {"workers": args.workers, "repeat": args.repeat, "apps": {}}
+    for name in args.apps.split(","):
+        report["apps"][name] = bench_app(name, args.workers, args.repeat)
+        print(f"{name}: done", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
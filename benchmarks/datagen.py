@@ -0,0 +1,153 @@
+"""Deterministic seed data for the benchmarks.
+
+The same scale and seed always produce the same rows, so runs on different
+commits are comparable. Rows are generated lazily in chunks and inserted with
+Core executemany, which keeps memory flat even at 1M postings.
+
+All three apps name their tables the same way (companies, pocs, employers,
+employer_poc_association, users, job_postings), so one seeder serves them all:
+each table present in the app's metadata is filled, and generated columns the
+table does not have are dropped.
+"""
+import datetime
+import random
+
+from passlib.context import CryptContext
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+CHUNK_SIZE = 10_000
+
+# Every seeded user can log in with this password
+BENCH_PASSWORD = "Bench-pass1!"
+
+INDUSTRIES = ["Software", "Finance", "Healthcare", "Retail", "Logistics", "Energy", "Education", "Media"]
+LOCATIONS = ["Remote", "Berlin", "London", "New York", "Bangalore", "Toronto", "Sydney", "Singapore"]
+WORDS = [
+    "python", "backend", "frontend", "senior", "junior", "engineer", "developer", "manager", "data",
+    "analyst", "cloud", "platform", "security", "mobile", "product", "designer", "sales", "support",
+    "devops", "machine", "learning", "fastapi", "sqlalchemy", "react", "team", "lead", "remote",
+]
+EPOCH = datetime.datetime(2024, 1, 1)
+
+
+def parse_scale(value: str) -> int:
+    return SCALES.get(value.lower()) or int(value)
+
+
+def sizes(scale: int) -> dict:
+    """Row counts per table; job_postings is the scale itself."""
+    return {
+        "companies": max(scale // 100, 10),
+        "pocs": max(scale // 20, 10),
+        "employers": max(scale // 50, 10),
+        "users": max(scale // 100, 10),
+        "job_postings": scale,
+    }
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def companies(n, rng):
+    for i in range(1, n + 1):
+        yield {
+            "id": i,
+            "name": f"Company {i}",
+            "industry": rng.choice(INDUSTRIES),
+            "about": _sentence(rng, 30),
+            "title": f"Company {i} Ltd",
+            "description": _sentence(rng, 30),
+            "website": f"https://company{i}.example.com",
+            "email": f"contact@company{i}.example.com",
+            "phone": f"+1-555-1{i:07d}",
+            "location": rng.choice(LOCATIONS),
+            "established": rng.randint(1950, 2024),
+        }
+
+
+def pocs(n, rng):
+    for i in range(1, n + 1):
+        yield {"id": i, "name": f"Contact {i}", "email": f"poc{i}@example.com", "phone": f"+1-555-2{i:07d}"}
+
+
+def employers(n, n_companies, rng):
+    for i in range(1, n + 1):
+        yield {
+            "id": i,
+            "name": f"Employer {i}",
+            "email": f"hr{i}@example.com",
+            "phone": f"+1-555-3{i:07d}",
+            "industry": rng.choice(INDUSTRIES),
+            "company_id": rng.randint(1, n_companies),
+        }
+
+
+def employer_pocs(n_employers, n_pocs, rng):
+    # Two distinct PoCs per employer
+    for i in range(1, n_employers + 1):
+        for poc_id in rng.sample(range(1, n_pocs + 1), 2):
+            yield {"employer_id": i, "poc_id": poc_id}
+
+
+def users(n, rng, hashed_password):
+    for i in range(1, n + 1):
+        yield {
+            "id": i,
+            "username": f"employer{i}",
+            "email": f"employer{i}@example.com",
+            "hashed_password": hashed_password,
+            "role": "employer",
+            "company": f"Company {i}",
+        }
+
+
+def job_postings(n, n_companies, n_users, rng):
+    for i in range(1, n + 1):
+        company = rng.randint(1, n_companies)
+        yield {
+            "id": i,
+            # Numbered so (employer_id, title) stays unique, as the Portal's index requires
+            "title": f"{_sentence(rng, 4).title()} {i}",
+            "description": _sentence(rng, 60),
+            "company": f"Company {company}",
+            "location": rng.choice(LOCATIONS),
+            "posted_at": EPOCH + datetime.timedelta(minutes=i),
+            "employer_id": rng.randint(1, n_users),
+        }
+
+
+def _insert(conn, table, rows):
+    columns = set(table.c.keys())
+    batch = []
+    for row in rows:
+        batch.append({k: v for k, v in row.items() if k in columns})
+        if len(batch) >= CHUNK_SIZE:
+            conn.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        conn.execute(table.insert(), batch)
+
+
+def seed(engine, metadata, scale: int, seed: int = 42) -> dict:
+    """Fill every known table in `metadata` and return {table: rows}."""
+    counts = sizes(scale)
+    hashed_password = CryptContext(schemes=["bcrypt"]).hash(BENCH_PASSWORD)
+    generators = {
+        "companies": lambda rng: companies(counts["companies"], rng),
+        "pocs": lambda rng: pocs(counts["pocs"], rng),
+        "employers": lambda rng: employers(counts["employers"], counts["companies"], rng),
+        "employer_poc_association": lambda rng: employer_pocs(counts["employers"], counts["pocs"], rng),
+        "users": lambda rng: users(counts["users"], rng, hashed_password),
+        "job_postings": lambda rng: job_postings(scale, counts["companies"], counts["users"], rng),
+    }
+    seeded = {}
+    with engine.begin() as conn:
+        for name, generate in generators.items():
+            table = metadata.tables.get(name)
+            if table is None:
+                continue
+            # One RNG per table, so adding a table never changes another's data
+            _insert(conn, table, generate(random.Random(f"{seed}:{name}")))
+            seeded[name] = conn.exec_driver_sql(f"SELECT COUNT(*) FROM {name}").scalar()
+    return seeded
@@ -0,0 +1,72 @@
+"""Payload size and latency of main.py's company endpoints with and without ?fields=.
+
+Each case is requested `--repeat` times through the ASGI app after a warm-up
+request; the ETag cache is bypassed so every request runs its query.
+
+    python -m benchmarks.fields --scale 100k --repeat 50 --fields id,name,industry
+"""
+import argparse
+import json
+import statistics
+import time
+
+from benchmarks import datagen
+from benchmarks.load import run_isolated
+
+
+def _bench(scale, seed, repeat, fields):
+    from fastapi.testclient import TestClient
+    import main
+
+    datagen.seed(main.engine, main.Base.metadata, scale, seed)
+    n_companies = datagen.sizes(scale)["companies"]
+    client = TestClient(main.app)
+    cases = {
+        "GET /companies?limit=1000": "/companies?limit=1000",
+        "GET /companies/{company_id}": f"/companies/{n_companies // 2}",
+    }
+    report = {}
+    for name, url in cases.items():
+        report[name] = {}
+        for label, query in (("all", ""), ("fields", f"fields={fields}")):
+            full_url = f"{url}{'&' if '?' in url else '?'}{query}" if query else url
+            body = client.get(full_url).content  # warm-up
+            timings = []
+            for _ in range(repeat):
+                main.table_versions.bump(["companies"])  # a fresh ETag: no cached body
+                started = time.perf_counter()
+                response = client.get(full_url)
+                timings.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+            report[name][label] = {
+                "bytes": len(body),
+                "median_ms": round(statistics.median(timings) * 1000, 2),
+                "p95_ms": round(sorted(timings)[int(len(timings) * 0.95) - 1] * 1000, 2),
+            }
+        before, after = report[name]["all"], report[name]["fields"]
+        report[name]["bytes_saved"] = f"{1 - after['bytes'] / before['bytes']:.0%}"
+        report[name]["speedup"] = round(before["median_ms"] / after["median_ms"], 2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k", help="datagen scale; companies are 1%% of it")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--fields", default="id,name,industry")
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    scale = datagen.parse_scale(args.scale)
+    report = {"scale": scale, "repeat": args.repeat, "fields": args.fields,
+              "results": run_isolated(_bench, scale, args.seed, args.repeat, args.fields)}
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
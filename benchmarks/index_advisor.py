@@ -0,0 +1,119 @@
+"""Flag full-table scans in the query plans of the benchmark workload.
+
+Replays the benchmarks.load scenarios against freshly seeded apps, runs
+EXPLAIN QUERY PLAN once for every distinct statement they issue, and lists the
+statements whose plan contains a full-table SCAN, with the routes that issued
+them. Exits with status 1 if any are found, so it can gate CI.
+
+    python -m benchmarks.index_advisor --apps main,portal --scale 10k
+
+Full scans that are the point of an endpoint (exports, the facet counts, which
+aggregate the whole summary table) are allowed with --allow, which matches
+against the route.
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+
+from sqlalchemy import event
+
+from benchmarks import datagen
+from benchmarks.load import LOADERS, SCENARIOS, drive, run_isolated
+
+DEFAULT_ALLOW = "GET /export/{entity},GET /jobpost/facets"
+_IN_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+
+
+def _explain(conn, statement, parameters):
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as exc:
+        return [f"EXPLAIN failed: {exc}"]
+    finally:
+        cursor.close()
+
+
+def full_scans(plan):
+    # "SCAN t" reads every row of t. "SCAN t USING [COVERING] INDEX" walks a whole
+    # index, which is still a full scan. FTS virtual tables manage their own access
+    # and "SCAN CONSTANT ROW" is a SELECT without a FROM.
+    return [
+        line for line in plan
+        if line.startswith("SCAN ") and "VIRTUAL TABLE" not in line and line != "SCAN CONSTANT ROW"
+    ]
+
+
+def _advise_app(name, scale, options):
+    app, engines, metadata, cursor = LOADERS[name]()
+    datagen.seed(engines[0], metadata, scale, options["seed"])
+    from common.metrics import current_route
+    statements = {}
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        route = current_route()
+        if route is None:  # seeding, startup
+            return
+        key = _IN_LIST.sub("(?...)", statement)
+        entry = statements.get(key)
+        if entry is None:
+            params = (parameters[0] if parameters else ()) if executemany else parameters
+            entry = statements[key] = {"statement": statement, "plan": _explain(conn, statement, params), "routes": set(), "count": 0}
+        entry["routes"].add(route)
+        entry["count"] += 1
+
+    for engine in engines:
+        event.listen(engine, "after_cursor_execute", _capture)
+    asyncio.run(drive(app, SCENARIOS[name](datagen.sizes(scale), cursor), options, [0]))
+
+    findings = []
+    for entry in statements.values():
+        scans = full_scans(entry["plan"])
+        routes = sorted(entry["routes"])
+        if scans and not all(any(a in r for a in options["allow"]) for r in routes):
+            findings.append({"scans": scans, "routes": routes, "count": entry["count"], "statement": entry["statement"], "plan": entry["plan"]})
+    return {"statements": len(statements), "findings": findings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", default="main,main12,portal")
+    parser.add_argument("--scale", default="10k")
+    parser.add_argument("--requests", type=int, default=20, help="requests per scenario; plans, not timings, matter here")
+    parser.add_argument("--allow", default=DEFAULT_ALLOW, help="comma separated routes whose full scans are expected")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="print the findings as JSON")
+    args = parser.parse_args()
+
+    options = {
+        "concurrency": 1,
+        "requests": args.requests,
+        "endpoints": [],
+        "seed": args.seed,
+        "allow": [a for a in args.allow.split(",") if a],
+    }
+    scale = datagen.parse_scale(args.scale)
+    results = {name: run_isolated(_advise_app, name, scale, options) for name in args.apps.split(",")}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, result in results.items():
+            if "error" in result:
+                print(f"{name}: failed\n{result['error']}")
+                continue
+            print(f"{name}: {result['statements']} distinct statements, {len(result['findings'])} with full scans")
+            for finding in result["findings"]:
+                print(f"  {', '.join(finding['routes'])} ({finding['count']}x)")
+                for line in finding["plan"]:
+                    print(f"    {'!! ' if line in finding['scans'] else '   '}{line}")
+                print(f"    {' '.join(finding['statement'].split())[:200]}")
+    failed = any("error" in r or r["findings"] for r in results.values())
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""In-process load test of main.py, main12.py and the Portal app.
+
+Each app runs in its own process and temporary working directory (the apps
+open their SQLite files relative to the cwd), is seeded with benchmarks.datagen
+at the requested scale and then driven over its ASGI interface with httpx, no
+server or network involved. Every endpoint is a scenario; each scenario sends
+--requests requests (scaled by its weight) from --concurrency workers.
+
+Per scenario the report has p50/p95/p99 latency, throughput, status counts and
+SQL statements per request; per app it has seed time, row counts and peak RSS
+during the load phase.
+
+    python -m benchmarks.load --apps main,main12,portal --scales 10k,100k --concurrency 8 --requests 200 --output bench.json
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+from sqlalchemy import event
+
+from benchmarks import datagen
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORTAL_DIR = os.path.join(REPO_DIR, "Portal")
+PORTAL_PASSWORD = "Benchpass1!"  # satisfies crud.PASSWORD_REGEX
+
+
+# --------- memory --------- #
+
+def _proc_status(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    # Linux only: makes VmHWM start again from the current RSS, so seeding does not count
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb():
+    peak = _proc_status("VmHWM")
+    if peak is None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return round(peak, 1)
+
+
+# --------- apps --------- #
+
+def _load_main():
+    import main
+    from common.pagination import encode_cursor
+    return main.app, [main.engine], main.Base.metadata, encode_cursor
+
+
+def _load_main12():
+    import main12
+    import database
+    return main12.app, [database.engine], database.Base.metadata, None
+
+
+def _load_portal():
+    os.environ.setdefault("DATABASE_URL", "sqlite:///./portal.db")
+    # Portal/app/main.py loads the build from FRONTEND_BUILD_PATH at import time;
+    # made inside run_isolated()'s temporary cwd, so it goes away with it
+    frontend_dir = tempfile.mkdtemp(prefix="frontend-", dir=os.getcwd())
+    with open(os.path.join(frontend_dir, "index.html"), "w") as f:
+        f.write("<!doctype html><title>bench</title>")
+    os.environ["FRONTEND_BUILD_PATH"] = frontend_dir
+    sys.path.insert(0, PORTAL_DIR)
+    from app import database, main
+    from common.pagination import encode_cursor
+    engines = [database.engine]
+    if database.async_engine is not None:
+        engines.append(database.async_engine.sync_engine)
+    return main.app, engines, database.Base.metadata, encode_cursor
+
+
+LOADERS = {"main": _load_main, "main12": _load_main12, "portal": _load_portal}
+
+
+# --------- scenarios --------- #
+# Each scenario is (name, method, weight, make) where make(rng, seq) returns the
+# URL and the httpx request kwargs. seq numbers the requests of one scenario, so
+# writes can use unique values and deletes can walk down from the highest id.
+
+def _main_scenarios(sizes, cursor):
+    n_companies, n_pocs, n_employers = sizes["companies"], sizes["pocs"], sizes["employers"]
+
+    def page(path, n):
+        return lambda rng, seq: (f"{path}?limit=100&after={cursor([rng.randint(1, n)])}", {})
+
+    def company(rng, seq):
+        return "/companies", {"json": {
+            "name": f"Bench Company {seq}", "industry": "Software", "about": "about", "location": "Remote",
+            "description": "description", "title": "title", "website": f"https://bench{seq}.example.com",
+            "email": f"bench-company{seq}@example.com", "phone": f"+1-555-7{seq:07d}", "established": 2020,
+        }}
+
+    # digit keeps generated phone numbers apart from each other and from the seed data (1-3)
+    def poc(prefix, digit):
+        return lambda rng, seq: {"name": f"{prefix} {seq}", "email": f"{prefix.lower()}{seq}@example.com", "phone": f"+1-555-{digit}{seq:07d}"}
+
+    def employer(prefix, digit):
+        return lambda rng, seq: {
+            "name": f"{prefix} {seq}", "email": f"{prefix.lower()}{seq}@example.com", "phone": f"+1-555-{digit}{seq:07d}",
+            "industry": "Software", "poc_ids": rng.sample(range(1, n_pocs + 1), 2), "company_id": rng.randint(1, n_companies),
+        }
+
+    new_poc, updated_poc = poc("BenchPoc", 4), poc("UpdatedPoc", 5)
+    new_employer, updated_employer = employer("BenchEmployer", 6), employer("UpdatedEmployer", 8)
+    return [
+        ("GET /companies", "GET", 1, page("/companies", n_companies)),
+        ("GET /pocs", "GET", 1, page("/pocs", n_pocs)),
+        ("GET /employers", "GET", 1, page("/employers", n_employers)),
+        ("GET /pocs/{poc_id}", "GET", 1, lambda rng, seq: (f"/pocs/{rng.randint(1, n_pocs)}", {})),
+        ("GET /employers/{employer_id}", "GET", 1, lambda rng, seq: (f"/employers/{rng.randint(1, n_employers)}", {})),
+        ("POST /companies", "POST", 1, company),
+        ("POST /pocs", "POST", 1, lambda rng, seq: ("/pocs", {"json": new_poc(rng, seq)})),
+        ("POST /employers", "POST", 1, lambda rng, seq: ("/employers", {"json": new_employer(rng, seq)})),
+        ("PUT /pocs/{poc_id}", "PUT", 1, lambda rng, seq: (f"/pocs/{rng.randint(1, n_pocs)}", {"json": updated_poc(rng, seq)})),
+        ("PUT /employers/{employer_id}", "PUT", 1, lambda rng, seq: (f"/employers/{rng.randint(1, n_employers)}", {"json": updated_employer(rng, seq)})),
+        ("DELETE /employers/{employer_id}", "DELETE", 1, lambda rng, seq: (f"/employers/{n_employers - seq}", {})),
+        ("DELETE /pocs/{poc_id}", "DELETE", 1, lambda rng, seq: (f"/pocs/{n_pocs - seq}", {})),
+    ]
+
+
+def _main12_scenarios(sizes, cursor):
+    n_postings = sizes["job_postings"]
+
+    def posting(rng, seq):
+        return {"title": f"Bench job {seq}", "description": " ".join(rng.choices(datagen.WORDS, k=60)), "company": "Bench"}
+
+    return [
+        ("POST /job-postings", "POST", 1, lambda rng, seq: ("/job-postings", {"json": posting(rng, seq)})),
+        ("POST /job-postings/bulk", "POST", 0.1, lambda rng, seq: ("/job-postings/bulk", {"json": [posting(rng, seq) for _ in range(100)]})),
+        ("DELETE /job-postings/{job_id}", "DELETE", 1, lambda rng, seq: (f"/job-postings/{n_postings - seq}", {})),
+    ]
+
+
+def _portal_scenarios(sizes, cursor):
+    from app import auth
+
+    n_companies, n_pocs, n_employers, n_users = sizes["companies"], sizes["pocs"], sizes["employers"], sizes["users"]
+    token = auth.create_access_token({"sub": "employer1"}, datetime.timedelta(hours=1))
+
+    def page(path, n):
+        return lambda rng, seq: (f"{path}?limit=100&after={cursor([rng.randint(1, n)])}", {})
+
+    def company(rng, seq):
+        return "/companies", {"json": {
+            "name": f"Bench Company {seq}", "industry": "Software", "about": "about", "location": "Remote",
+            "description": "description", "title": "title", "website": f"https://bench{seq}.example.com",
+            "email": f"bench-company{seq}@example.com", "phone": f"+1-555-7{seq:07d}", "established": 2020,
+        }}
+
+    def employer(rng, seq):
+        return "/employers", {"json": {
+            "name": f"Bench Employer {seq}", "email": f"benchemployer{seq}@example.com", "phone": f"+1-555-8{seq:07d}",
+            "industry": "Software", "poc_ids": rng.sample(range(1, n_pocs + 1), 2), "company_id": rng.randint(1, n_companies),
+        }}
+
+    def job(rng, seq):
+        return f"/jobpost/?employer_id={rng.randint(1, n_users)}", {"json": {
+            "title": f"Bench job {seq}", "description": " ".join(rng.choices(datagen.WORDS, k=60)),
+            "company": "Bench", "location": rng.choice(datagen.LOCATIONS),
+        }}
+
+    def signup(rng, seq):
+        return "/signup/", {"json": {"username": f"bench{seq}", "email": f"bench{seq}@example.com", "role": "employee", "password": PORTAL_PASSWORD}}
+
+    def login(rng, seq):
+        return "/login", {"data": {"username": f"employer{rng.randint(1, n_users)}", "password": datagen.BENCH_PASSWORD}}
+
+    return [
+        ("GET /companies", "GET", 1, page("/companies", n_companies)),
+        ("GET /pocs", "GET", 1, page("/pocs", n_pocs)),
+        ("GET /employers", "GET", 1, page("/employers", n_employers)),
+        ("GET /jobpost/employer/{employer_id}", "GET", 1, lambda rng, seq: (f"/jobpost/employer/{rng.randint(1, n_users)}", {})),
+        ("GET /jobpost/search", "GET", 1, lambda rng, seq: (f"/jobpost/search?q={rng.choice(datagen.WORDS)}", {})),
+        ("GET /jobpost/facets", "GET", 1, lambda rng, seq: (f"/jobpost/facets?location={rng.choice(datagen.LOCATIONS)}", {})),
+        ("GET /autocomplete", "GET", 1, lambda rng, seq: (f"/autocomplete?field=title&prefix={rng.choice(datagen.WORDS)[:rng.randint(1, 4)]}", {})),
+        ("GET /users/me", "GET", 1, lambda rng, seq: ("/users/me", {"headers": {"Authorization": f"Bearer {token}"}})),
+        ("GET /metrics", "GET", 0.1, lambda rng, seq: ("/metrics", {})),
+        ("GET /export/companies", "GET", 0.02, lambda rng, seq: ("/export/companies", {})),
+        ("POST /companies", "POST", 1, company),
+        ("POST /pocs", "POST", 1, lambda rng, seq: ("/pocs", {"json": {"name": f"Bench PoC {seq}", "email": f"benchpoc{seq}@example.com", "phone": f"+1-555-9{seq:07d}"}})),
+        ("POST /employers", "POST", 1, employer),
+        ("POST /jobpost/", "POST", 1, job),
+        ("POST /signup/", "POST", 0.1, signup),
+        ("POST /login", "POST", 0.1, login),
+    ]
+
+
+SCENARIOS = {"main": _main_scenarios, "main12": _main12_scenarios, "portal": _portal_scenarios}
+
+
+# --------- driver --------- #
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def _run_scenario(client, scenario, requests, concurrency, statements, seed):
+    name, method, weight, make = scenario
+    total = max(1, int(requests * weight))
+    seqs = itertools.count()
+    rng = random.Random(f"{seed}:{name}")
+    latencies, statuses = [], {}
+
+    async def worker():
+        while True:
+            seq = next(seqs)
+            if seq >= total:
+                return
+            url, kwargs = make(rng, seq)
+            began = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            await response.aread()
+            latencies.append(time.perf_counter() - began)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    statements_before = statements[0]
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": total,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "sql_per_request": round((statements[0] - statements_before) / total, 2),
+    }
+
+
+async def drive(app, scenarios, options, statements):
+    import httpx
+
+    results = {}
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in scenarios:
+                if options["endpoints"] and not any(e in scenario[0] for e in options["endpoints"]):
+                    continue
+                results[scenario[0]] = await _run_scenario(
+                    client, scenario, options["requests"], options["concurrency"], statements, options["seed"]
+                )
+    return results
+
+
+def _bench_app(name, scale, options):
+    loader = LOADERS[name]
+    app, engines, metadata, cursor = loader()
+
+    started = time.perf_counter()
+    rows = datagen.seed(engines[0], metadata, scale, options["seed"])
+    seed_seconds = round(time.perf_counter() - started, 2)
+
+    statements = [0]
+
+    def _count(*args):
+        statements[0] += 1
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _count)
+
+    scenarios = SCENARIOS[name](datagen.sizes(scale), cursor)
+    _reset_peak_rss()
+    endpoints = asyncio.run(drive(app, scenarios, options, statements))
+    return {"seed_seconds": seed_seconds, "rows": rows, "peak_rss_mb": _peak_rss_mb(), "endpoints": endpoints}
+
+
+def _child(target, args, queue):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        sys.path.insert(0, REPO_DIR)
+        try:
+            queue.put(target(*args))
+        except Exception:
+            queue.put({"error": traceback.format_exc()})
+
+
+def run_isolated(target, *args):
+    """Run target(*args) in a fresh process whose cwd is a temporary directory."""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_child, args=(target, args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", default="main,main12,portal")
+    parser.add_argument("--scales", default="10k", help="comma separated: 10k, 100k, 1m or a row count")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario, before its weight")
+    parser.add_argument("--endpoints", default="", help="only run scenarios whose name contains one of these (comma separated)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    options = {
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "endpoints": [e for e in args.endpoints.split(",") if e],
+        "seed": args.seed,
+    }
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "options": options,
+        "runs": [],
+    }
+    for scale_name in args.scales.split(","):
+        scale = datagen.parse_scale(scale_name)
+        for name in args.apps.split(","):
+            result = run_isolated(_bench_app, name, scale, options)
+            report["runs"].append({"app": name, "scale": scale, **result})
+            print(f"{name} @ {scale}: done", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
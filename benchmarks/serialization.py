@@ -0,0 +1,114 @@
+"""Rows/s of the Portal list endpoints' default vs FAST_JSON serialization path.
+
+"default" is what FastAPI does today: ORM objects, then jsonable_encoder (GET
+/companies) or response_model validation from attributes (GET
+/jobpost/employer/{id}), then json.dumps. "fast" is the FAST_JSON path: column
+tuples, one TypeAdapter call per page and orjson.
+
+    python -m benchmarks.serialization --rows 1000 --repeat 50
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+PORTAL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Portal")
+
+
+def _load_portal(db_path):
+    # The Portal package is imported as "app" and binds its engine at import time
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    sys.path.insert(0, PORTAL_DIR)
+    from app import crud, fast_json, models, schemas
+    from app.database import SessionLocal, engine
+    models.Base.metadata.create_all(bind=engine)  # as app/main.py does
+    return crud, fast_json, models, schemas, SessionLocal
+
+
+def _seed(models, SessionLocal, rows):
+    with SessionLocal() as db:
+        employer = models.User(username="bench", email="bench@example.com", hashed_password="x", role="employer", company="Bench")
+        db.add(employer)
+        db.flush()
+        db.execute(models.Company.__table__.insert(), [
+            {"name": f"Company {i}", "industry": "Software", "about": "a" * 200, "website": f"https://c{i}.example.com",
+             "email": f"c{i}@example.com", "phone": str(i), "location": "Remote", "established": 2000 + i % 20}
+            for i in range(rows)
+        ])
+        db.execute(models.JobPosting.__table__.insert(), [
+            {"title": f"Job {i}", "description": "d" * 500, "company": "Bench", "location": "Remote", "employer_id": employer.id}
+            for i in range(rows)
+        ])
+        db.commit()
+        return employer.id
+
+
+def _measure(fn, rows, repeat):
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = fn()
+    elapsed = time.perf_counter() - started
+    return {"rows_per_s": round(rows * repeat / elapsed), "ms_per_page": round(elapsed / repeat * 1000, 2), "bytes": len(body)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="rows per page (max page size is 1000)")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+    from starlette.responses import JSONResponse
+
+    with tempfile.TemporaryDirectory() as tmp:
+        crud, fast_json, models, schemas, SessionLocal = _load_portal(os.path.join(tmp, "bench.db"))
+        employer_id = _seed(models, SessionLocal, args.rows)
+        job_adapter = fast_json.list_adapter(schemas.JobPostingWithoutId)
+
+        with SessionLocal() as db:
+            def companies_default():
+                companies, _ = crud.get_companies(db, None, args.rows)
+                db.expunge_all()
+                return JSONResponse(jsonable_encoder(companies)).body
+
+            def companies_fast():
+                rows, _ = crud.get_company_rows(db, None, args.rows)
+                return fast_json.list_response(rows, schemas.Company).body
+
+            def jobs_default():
+                jobs, _ = crud.get_jobs_by_employer(db, employer_id, None, args.rows)
+                db.expunge_all()
+                validated = job_adapter.validate_python(jobs, from_attributes=True)
+                return JSONResponse(job_adapter.dump_python(validated, mode="json")).body
+
+            def jobs_fast():
+                rows, _ = crud.get_job_rows_by_employer(db, employer_id, None, args.rows)
+                return fast_json.list_response(rows, schemas.JobPostingWithoutId).body
+
+            # Both paths must produce the same documents
+            assert json.loads(companies_default()) == json.loads(companies_fast())
+            assert json.loads(jobs_default()) == json.loads(jobs_fast())
+
+            report = {"rows": args.rows, "repeat": args.repeat, "results": {}}
+            for name, default, fast in (("companies", companies_default, companies_fast), ("jobs_by_employer", jobs_default, jobs_fast)):
+                before = _measure(default, args.rows, args.repeat)
+                after = _measure(fast, args.rows, args.repeat)
+                report["results"][name] = {
+                    "default": before,
+                    "fast": after,
+                    "speedup": round(after["rows_per_s"] / before["rows_per_s"], 2),
+                }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
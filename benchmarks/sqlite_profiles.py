@@ -0,0 +1,117 @@
+"""Mixed read/write throughput of each SQLite PRAGMA profile.
+
+Every reader and writer is a separate process with its own engine, the way
+several uvicorn workers share one database file. Writers insert one posting
+per transaction (like POST /job-postings); readers fetch random postings by id.
+
+    python -m benchmarks.sqlite_profiles --readers 4 --writers 2 --seconds 5
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, JobPosting
+from common.db_engine import SQLITE_PROFILES, make_engine
+
+SEED_ROWS = 10000
+
+
+def _seed(url, profile):
+    engine = make_engine(url, profile)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(JobPosting.__table__.insert(), [
+            {"title": f"Job {i}", "description": "x" * 200, "company": f"Company {i % 100}"}
+            for i in range(SEED_ROWS)
+        ])
+    engine.dispose()
+
+
+def _worker(role, url, profile, start_at, seconds, results):
+    engine = make_engine(url, profile)
+    Session = sessionmaker(bind=engine)
+    rng = random.Random(os.getpid())
+    ops = errors = 0
+    latencies = []
+    while time.time() < start_at:
+        time.sleep(0.001)
+    deadline = start_at + seconds
+    with Session() as db:
+        while time.time() < deadline:
+            began = time.perf_counter()
+            try:
+                if role == "read":
+                    db.get(JobPosting, rng.randint(1, SEED_ROWS))
+                    db.rollback()  # end the read transaction, like a request would
+                else:
+                    db.add(JobPosting(title="New job", description="y" * 200, company="Bench"))
+                    db.commit()
+                ops += 1
+                latencies.append(time.perf_counter() - began)
+            except OperationalError:  # "database is locked"
+                db.rollback()
+                errors += 1
+            db.expunge_all()
+    engine.dispose()
+    results.put((role, ops, errors, latencies))
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_profile(profile, readers, writers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        _seed(url, profile)
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        start_at = time.time() + 2.0  # let every process start before the clock runs
+        procs = [ctx.Process(target=_worker, args=("read", url, profile, start_at, seconds, results)) for _ in range(readers)]
+        procs += [ctx.Process(target=_worker, args=("write", url, profile, start_at, seconds, results)) for _ in range(writers)]
+        for p in procs:
+            p.start()
+        collected = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+
+    report = {"profile": profile, "pragmas": SQLITE_PROFILES[profile], "readers": readers, "writers": writers, "seconds": seconds}
+    for role in ("read", "write"):
+        rows = [r for r in collected if r[0] == role]
+        latencies = [l for r in rows for l in r[3]]
+        report[f"{role}s_per_sec"] = round(sum(r[1] for r in rows) / seconds, 1)
+        report[f"{role}_errors"] = sum(r[2] for r in rows)
+        p99 = _percentile(latencies, 99)
+        report[f"{role}_p99_ms"] = round(p99 * 1000, 3) if p99 is not None else None
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", nargs="*", default=list(SQLITE_PROFILES))
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    reports = [run_profile(p, args.readers, args.writers, args.seconds) for p in args.profiles]
+    text = json.dumps(reports, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
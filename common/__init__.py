@@ -0,0 +1 @@
+"""Modules shared by main.py, main12.py and the Portal app (Portal/app)."""
@@ -0,0 +1,59 @@
+import os
+from sqlalchemy import create_engine, event
+
+# PRAGMA profiles applied to every new SQLite connection.
+# "default" is SQLite's own behaviour (rollback journal, readers blocked by writers);
+# "wal" lets readers run concurrently with the single writer and only fsyncs at
+# checkpoints; "wal-durable" keeps WAL but fsyncs every commit.
+SQLITE_PROFILES = {
+    "default": {},
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -65536,      # negative = KiB, i.e. 64 MiB page cache
+        "mmap_size": 268435456,    # 256 MiB memory-mapped reads
+        "temp_store": "MEMORY",
+    },
+    "wal-durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+}
+
+# Profile used when make_engine() is not given one explicitly
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "wal")
+
+
+def apply_sqlite_pragmas(engine, pragmas: dict):
+    """Run the given PRAGMAs on every connection the engine opens."""
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def make_engine(url: str, profile: str = None, **kwargs):
+    """create_engine() with the repo's SQLite settings applied.
+
+    Non-SQLite URLs are passed straight through to create_engine().
+    """
+    if not url.startswith("sqlite"):
+        return create_engine(url, **kwargs)
+
+    profile = profile or SQLITE_PROFILE
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile {profile!r}, expected one of {sorted(SQLITE_PROFILES)}")
+    connect_args = {"check_same_thread": False, **kwargs.pop("connect_args", {})}
+    engine = create_engine(url, connect_args=connect_args, **kwargs)
+    apply_sqlite_pragmas(engine, SQLITE_PROFILES[profile])
+    return engine
@@ -0,0 +1,208 @@
+import bisect
+import contextvars
+import threading
+import time
+
+from sqlalchemy import event
+
+# Minimal in-process metrics rendered in the Prometheus text format.
+# Every metric registers itself in REGISTRY on creation.
+REGISTRY = []
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_str(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY.append(self)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_label_str(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._values.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_label_str(self.labelnames, labels, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_str(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_label_str(self.labelnames, labels)} {count}")
+        return lines
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --------- per-request HTTP and SQL metrics --------- #
+
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+http_requests_total = Counter("http_requests_total", "HTTP requests by route and status", ["method", "route", "status"])
+http_request_duration_seconds = Histogram("http_request_duration_seconds", "Time to send the full response", ["method", "route"])
+http_response_size_bytes = Histogram("http_response_size_bytes", "Response body size", ["method", "route"], SIZE_BUCKETS)
+http_requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+db_statements_per_request = Histogram("db_statements_per_request", "SQL statements executed by one request", ["method", "route"], STATEMENT_BUCKETS)
+db_seconds_per_request = Histogram("db_seconds_per_request", "Time one request spent in SQL statements", ["method", "route"])
+db_statements_total = Counter("db_statements_total", "SQL statements executed, in or outside requests")
+db_seconds_total = Counter("db_seconds_total", "Time spent in SQL statements, in or outside requests")
+
+# Mutable per-request totals; the object is shared with the threadpool thread
+# that runs a sync endpoint, so statements executed there are counted too.
+_request_stats = contextvars.ContextVar("request_stats", default=None)
+
+
+class _RequestStats:
+    __slots__ = ("scope", "statements", "db_seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+def current_route():
+    """The "METHOD /route/{template}" of the request being served, or None outside requests."""
+    stats = _request_stats.get()
+    if stats is None:
+        return None
+    route = stats.scope.get("route")
+    return f"{stats.scope['method']} {getattr(route, 'path', stats.scope['path'])}"
+
+
+def instrument_engine(engine):
+    """Count statements and time spent in them for every query on `engine`."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        db_statements_total.inc()
+        db_seconds_total.inc(amount=elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += elapsed
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware, so it adds no extra task or body buffering per request.
+
+    Requests are labelled with the route template (e.g. "/pocs/{poc_id}"), not
+    the raw path, to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats = _RequestStats(scope)
+        token = _request_stats.set(stats)
+        response = {"status": 500, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            _request_stats.reset(token)
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            method = scope["method"]
+            http_requests_total.inc(method, route, response["status"])
+            http_request_duration_seconds.observe(time.perf_counter() - started, method, route)
+            http_response_size_bytes.observe(response["size"], method, route)
+            db_statements_per_request.observe(stats.statements, method, route)
+            db_seconds_per_request.observe(stats.db_seconds, method, route)
+
+
+def install_request_metrics(app, *engines):
+    """Add the request middleware (outermost) and SQL hooks for the given engines."""
+    app.add_middleware(RequestMetricsMiddleware)
+    for engine in engines:
+        if engine is not None:
+            # Events go on the sync core of an AsyncEngine
+            instrument_engine(getattr(engine, "sync_engine", engine))
@@ -0,0 +1,75 @@
+import base64
+import binascii
+import datetime
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import DateTime, literal, tuple_
+
+# Page size used when the client does not send ?limit=
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Shared query parameters for every paginated list endpoint
+AfterParam = Query(None, description="Opaque cursor taken from the X-Next-Cursor header of the previous page")
+LimitParam = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime.datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key_columns):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(key_columns):
+            raise ValueError(cursor)
+        return [
+            datetime.datetime.fromisoformat(v) if isinstance(col.type, DateTime) else v
+            for v, col in zip(values, key_columns)
+        ]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_filter(query, key_columns, after: Optional[str], limit: int, descending: bool = False):
+    """Apply the seek predicate, ordering and limit for one keyset page.
+
+    Works on both legacy Query objects and select() statements. One extra row
+    is fetched so next_page() can tell whether another page exists.
+    """
+    if after is not None:
+        values = decode_cursor(after, key_columns)
+        key = tuple_(*key_columns)
+        bound = tuple_(*[literal(v, col.type) for v, col in zip(values, key_columns)])
+        query = query.filter(key < bound if descending else key > bound)
+
+    order_by = [col.desc() if descending else col.asc() for col in key_columns]
+    return query.order_by(*order_by).limit(limit + 1)
+
+
+def next_page(rows, key_columns, limit: int):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], col.key) for col in key_columns])
+    return rows, next_cursor
+
+
+def paginate(query, key_columns, after: Optional[str], limit: int, descending: bool = False):
+    """Return one keyset page of `query` plus the cursor for the next page (or None).
+
+    The page is selected with a seek predicate on `key_columns` (which must be
+    unique together and indexed) rather than OFFSET, so deep pages cost the same
+    as the first one.
+    """
+    rows = keyset_filter(query, key_columns, after, limit, descending).all()
+    return next_page(rows, key_columns, limit)
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
@@ -0,0 +1,167 @@
+import hashlib
+import logging
+import os
+from contextlib import contextmanager
+from sqlalchemy import func, inspect, select
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock, so run a single worker or migrate before starting
+    fcntl = None
+
+_logger = logging.getLogger(__name__)
+
+# SCHEMA_CHECK=0 skips the startup check, for deployments that migrate before starting the app
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "1") == "1"
+# Lock file for databases that are not a local SQLite file
+SCHEMA_LOCK_PATH = os.getenv("SCHEMA_LOCK_PATH", "schema.lock")
+
+_skipped = 0
+
+
+@contextmanager
+def skipping_schema_check():
+    """Import or start an app without its startup schema check, e.g. from Alembic's env.py."""
+    global _skipped
+    _skipped += 1
+    try:
+        yield
+    finally:
+        _skipped -= 1
+
+
+def schema_fingerprint(metadata, *extra) -> int:
+    """31-bit digest of the tables, columns and indexes in `metadata`, plus `extra` strings.
+
+    It fits SQLite's user_version, where ensure_schema() keeps it.
+    """
+    parts = []
+    for table in metadata.sorted_tables:
+        parts.append(f"table {table.name}")
+        for column in table.columns:
+            foreign_keys = sorted(fk.target_fullname for fk in column.foreign_keys)
+            parts.append(
+                f"  {column.name} {column.type!r} nullable={column.nullable} pk={column.primary_key} "
+                f"unique={column.unique} fk={foreign_keys}"
+            )
+        for index in sorted(table.indexes, key=lambda i: str(i.name)):
+            parts.append(f"  index {index.name} {[c.name for c in index.columns]} unique={index.unique}")
+    parts.extend(extra)
+    digest = hashlib.sha1("\n".join(parts).encode()).digest()
+    return int.from_bytes(digest[:4], "big") & 0x7FFFFFFF or 1  # 0 is what a new database has
+
+
+# Duplicate key groups listed when a unique index cannot be created
+DUPLICATES_SHOWN = 10
+
+
+def _check_duplicates(connection, index):
+    columns = list(index.columns)
+    groups = connection.execute(
+        select(*columns, func.count().label("rows"))
+        .where(*(column.is_not(None) for column in columns))
+        .group_by(*columns)
+        .having(func.count() > 1)
+        .limit(DUPLICATES_SHOWN + 1)
+    ).all()
+    if groups:
+        shown = ", ".join(f"{tuple(group[:-1])} x{group[-1]}" for group in groups[:DUPLICATES_SHOWN])
+        more = " and more" if len(groups) > DUPLICATES_SHOWN else ""
+        raise RuntimeError(
+            f"Cannot create unique index {index.name}: {index.table.name} has rows sharing "
+            f"({', '.join(c.name for c in columns)}): {shown}{more}. Remove the duplicates and start again."
+        )
+
+
+def create_schema(connection, metadata):
+    """create_all(), plus the indexes of tables that already existed (create_all skips those).
+
+    A unique index is only added once the rows it would cover are checked for
+    duplicates; if there are any, the first few are listed in a RuntimeError.
+    """
+    metadata.create_all(connection)
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            if index.unique and not connection.dialect.has_index(connection, table.name, index.name):
+                _check_duplicates(connection, index)
+            index.create(connection, checkfirst=True)
+
+
+def missing_schema(connection, metadata):
+    """Tables, columns and indexes of `metadata` that the database does not have."""
+    inspector = inspect(connection)
+    existing = set(inspector.get_table_names())
+    missing = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing:
+            missing.append(f"table {table.name}")
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        missing += [f"column {table.name}.{column.name}" for column in table.columns if column.name not in columns]
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing += [f"index {index.name}" for index in table.indexes if index.name not in indexes]
+    return missing
+
+
+def _stored_fingerprint(conn):
+    if conn.dialect.name != "sqlite":
+        return None
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def _lock_path(engine):
+    database = engine.url.database
+    if engine.dialect.name == "sqlite" and database and database != ":memory:":
+        return database + ".lock"
+    return SCHEMA_LOCK_PATH
+
+
+@contextmanager
+def _file_lock(path):
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def ensure_schema(engine, metadata, migrate=None, extra=()) -> bool:
+    """Bring the database up to `metadata` unless it already is; True if this process migrated.
+
+    On a current SQLite database this costs one PRAGMA read. Otherwise the first
+    process to take the file lock runs migrate(connection) (create_schema() by
+    default) and records the fingerprint; other workers wait on the lock, find it
+    recorded and go on. Other databases have no user_version, so they migrate under the
+    lock on every start and migrate() must be idempotent.
+
+    If the database still lacks part of `metadata` after migrate() (create_all()
+    adds no columns to an existing table, say), nothing is recorded and startup
+    fails with what is missing.
+    """
+    if not SCHEMA_CHECK or _skipped:
+        return False
+    fingerprint = schema_fingerprint(metadata, *extra)
+    with engine.connect() as conn:
+        if _stored_fingerprint(conn) == fingerprint:
+            return False
+    with _file_lock(_lock_path(engine)):
+        with engine.begin() as conn:
+            if _stored_fingerprint(conn) == fingerprint:
+                return False
+            if migrate is None:
+                create_schema(conn, metadata)
+            else:
+                migrate(conn)
+            missing = missing_schema(conn, metadata)
+            if missing:
+                raise RuntimeError(
+                    f"{engine.url.database} does not match the models after migrating; missing {', '.join(missing)}"
+                )
+            if conn.dialect.name == "sqlite":
+                conn.exec_driver_sql(f"PRAGMA user_version = {fingerprint}")
+    _logger.info("Migrated %s to schema %d", engine.url.database, fingerprint)
+    return True
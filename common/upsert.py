@@ -0,0 +1,75 @@
+import importlib
+import re
+
+# Dialects whose INSERT supports ON CONFLICT ... DO NOTHING / DO UPDATE together with RETURNING.
+# Imported on first use: the PostgreSQL dialect alone adds ~40 ms to every start.
+_DIALECT_INSERTS = {"sqlite": "sqlalchemy.dialects.sqlite", "postgresql": "sqlalchemy.dialects.postgresql"}
+
+# Rows per multi-VALUES upsert statement, well under SQLite's bound-parameter limit
+UPSERT_CHUNK = 500
+
+
+# How SQLite ("UNIQUE constraint failed: users.email") and PostgreSQL
+# ("Key (email)=(...) already exists") name the columns of a violated unique constraint
+_UNIQUE_COLUMNS = (re.compile(r"UNIQUE constraint failed: ([\w., ]+)"), re.compile(r"Key \(([\w, ]+)\)=\("))
+
+
+def unique_violation(exc) -> set:
+    """Columns of the unique constraint an IntegrityError reports; empty for NOT NULL, CHECK or FK failures."""
+    message = str(getattr(exc, "orig", exc))
+    for pattern in _UNIQUE_COLUMNS:
+        match = pattern.search(message)
+        if match:
+            return {name.strip().rsplit(".", 1)[-1] for name in match.group(1).split(",")}
+    return set()
+
+
+def dialect_insert(bind, target):
+    name = bind.dialect.name
+    if name not in _DIALECT_INSERTS:
+        raise NotImplementedError(f"ON CONFLICT inserts are not supported on {name}")
+    return importlib.import_module(_DIALECT_INSERTS[name]).insert(target)
+
+
+def column_values(table, data: dict) -> dict:
+    """Keep only the keys of `data` that are columns of `table`."""
+    return {k: v for k, v in data.items() if k in table.c}
+
+
+def insert_unless_exists(bind, model, values: dict, conflict_columns):
+    """INSERT ... ON CONFLICT (conflict_columns) DO NOTHING RETURNING <model>.
+
+    Executed with session.scalars() it yields the new ORM object, or nothing if
+    a row with the same conflict_columns already exists: one statement instead
+    of a SELECT probe followed by an INSERT, and no race between the two.
+    """
+    return (
+        dialect_insert(bind, model)
+        .values(**column_values(model.__table__, values))
+        .on_conflict_do_nothing(index_elements=conflict_columns)
+        .returning(model)
+    )
+
+
+def upsert_rows(bind, table, rows, key_column: str):
+    """Multi-row INSERT ... ON CONFLICT (key_column) DO UPDATE, returning (id, key).
+
+    Every non-key column given in the rows is overwritten with the new value.
+    """
+    stmt = dialect_insert(bind, table).values(rows)
+    update = {name: stmt.excluded[name] for name in rows[0] if name != key_column}
+    return stmt.on_conflict_do_update(index_elements=[key_column], set_=update).returning(table.c.id, table.c[key_column])
+
+
+def dedupe_rows(table, items, key_column: str):
+    """Column dicts for a bulk upsert, one per key (the last one wins)."""
+    rows = {}
+    for item in items:
+        row = column_values(table, item)
+        rows[row[key_column]] = row
+    return list(rows.values())
+
+
+def chunks(rows, size: int = UPSERT_CHUNK):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
@@ -1,11 +1,14 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import datetime
 
+from common.db_engine import make_engine
+from common.schema_check import ensure_schema
+
 # Create the database engine
 SQLALCHEMY_DATABASE_URL = "sqlite:///./job_postings.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
 
 # Create a session for database transactions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -23,6 +26,7 @@ class JobPosting(Base):
     company = Column(String)
     posted_at = Column(DateTime, default=datetime.datetime.utcnow)
 
-# Function to create the database tables
+# Create missing tables, unless the stored schema fingerprint says they are current
+# (safe to call from every worker; see common/schema_check.py)
 def create_database():
-    Base.metadata.create_all(bind=engine)
+    return ensure_schema(engine, Base.metadata)
@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import inspect
+
+# Sparse fieldsets: ?fields=id,name,industry selects just those columns in SQL,
+# so large TEXT columns the client did not ask for are neither read nor serialized
+FieldsParam = Query(None, description="Comma-separated columns to return, e.g. id,name,industry (default: all)")
+
+
+def parse_fields(model, fields: Optional[str], always=("id",)):
+    """The model columns named in `fields`, or None when every column is wanted.
+
+    `always` columns (the key that pagination and clients rely on) are returned
+    whether asked for or not. Unknown names are a 400 listing the valid ones.
+    """
+    if fields is None:
+        return None
+    columns = {attr.key: attr for attr in inspect(model).column_attrs}
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in columns]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s) {', '.join(unknown) or '(none given)'}; choose from {', '.join(columns)}",
+        )
+    # dict.fromkeys keeps the order and drops repeats
+    return [getattr(model, name) for name in dict.fromkeys([*always, *names])]
+
+
+def query_fields(db, model, columns):
+    """A query for whole `model` objects, or for just `columns` when given."""
+    return db.query(model) if columns is None else db.query(*columns)
+
+
+def rows_to_dicts(rows, columns):
+    """Column rows as dicts for the response; ORM objects are returned as they are."""
+    return rows if columns is None else [row._asdict() for row in rows]
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from fastapi import Request, Response
+from sqlalchemy import event
+from starlette.routing import Match
+
+from common.cache import TTLCache
+
+# Responses bigger than this are revalidated with ETags but not kept in memory
+RESPONSE_CACHE_MAX_BODY = int(os.getenv("RESPONSE_CACHE_MAX_BODY", str(1024 * 1024)))
+
+_WRITE_RE = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+["`\[]?(\w+)',
+    re.IGNORECASE,
+)
+
+
+class TableVersions:
+    """Per-table write counters for one database.
+
+    Every committed INSERT / UPDATE / DELETE bumps the version of the table it
+    touched. Counters live in-process; to make other worker processes notice too,
+    each bump also moves the mtime of a small sidecar file next to the SQLite
+    database, and that mtime is part of every version snapshot.
+    """
+
+    def __init__(self, epoch_path: str = None):
+        self._versions = defaultdict(int)
+        self._lock = threading.Lock()
+        self.epoch_path = epoch_path
+
+    def _epoch(self):
+        if self.epoch_path is None:
+            return 0
+        try:
+            return os.stat(self.epoch_path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def snapshot(self, tables):
+        with self._lock:
+            versions = tuple(self._versions[t] for t in tables)
+        return versions, self._epoch()
+
+    def bump(self, tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table] += 1
+            if self.epoch_path is not None:
+                with open(self.epoch_path, "a"):
+                    pass
+                now = max(time.time_ns(), self._epoch() + 1)
+                os.utime(self.epoch_path, ns=(now, now))
+
+    def track(self, engine):
+        # Writes are collected per DBAPI connection and published only once the
+        # connection is checked back into the pool, i.e. after its commit has
+        # finished, so no reader can cache pre-commit data under a new version.
+        @event.listens_for(engine, "after_cursor_execute")
+        def _note_write(conn, cursor, statement, parameters, context, executemany):
+            match = _WRITE_RE.match(statement)
+            if match:
+                conn.info.setdefault("written_tables", set()).add(match.group(1))
+
+        @event.listens_for(engine, "commit")
+        def _note_commit(conn):
+            written = conn.info.pop("written_tables", None)
+            if written:
+                conn.info.setdefault("committed_tables", set()).update(written)
+
+        @event.listens_for(engine, "rollback")
+        def _discard(conn):
+            conn.info.pop("written_tables", None)
+
+        @event.listens_for(engine.pool, "checkin")
+        def _publish(dbapi_connection, connection_record):
+            committed = connection_record.info.pop("committed_tables", None)
+            if committed:
+                self.bump(committed)
+
+
+def _if_none_match(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def install_conditional_get(app, engine, route_tables: dict, epoch_path: str = None, cache_size: int = 1024):
+    """Add ETag / If-None-Match handling and a version-keyed response cache.
+
+    `route_tables` maps a GET route path (e.g. "/pocs/{poc_id}") to the tables
+    its response is built from. The ETag covers the route, the concrete URL and
+    query string, and the current version of those tables, so a 304 or a cached
+    body is returned before the endpoint (and the database) is reached.
+    """
+    versions = TableVersions(epoch_path)
+    versions.track(engine)
+    responses = TTLCache(maxsize=cache_size)
+
+    def _route_path(scope):
+        for route in app.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                # Recorded like the router does, so 304s and cache hits keep their route label
+                scope["route"] = route
+                return getattr(route, "path", None)
+        return None
+
+    @app.middleware("http")
+    async def conditional_get(request: Request, call_next):
+        if request.method != "GET":
+            return await call_next(request)
+        route_path = _route_path(request.scope)
+        tables = route_tables.get(route_path)
+        if tables is None:
+            return await call_next(request)
+
+        key = f"{route_path}|{request.url.path}|{request.url.query}|{versions.snapshot(tables)}"
+        etag = '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+        if _if_none_match(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        cached = responses.get(etag)
+        if cached is not None:
+            body, headers = cached
+            return Response(content=body, status_code=200, headers=headers)
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = dict(response.headers)
+        headers["etag"] = etag
+        if len(body) <= RESPONSE_CACHE_MAX_BODY:
+            responses.set(etag, (body, headers))
+        return Response(content=body, status_code=200, headers=headers)
+
+    return versions
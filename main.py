@@ -1,16 +1,27 @@
-from fastapi import FastAPI, HTTPException, Depends
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey ,Table
+from fastapi import FastAPI, HTTPException, Depends, Response
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import Column, Index, Integer, String, ForeignKey ,Table, exists, func, literal, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship, Session
+from sqlalchemy.orm import sessionmaker, relationship, Session, selectinload
 from pydantic import BaseModel
 from pydantic import BaseModel, EmailStr
 from typing import List
 
 from typing import Optional
+import os
+
+from common import metrics
+from common.db_engine import make_engine
+from fields import FieldsParam, parse_fields, query_fields, rows_to_dicts
+from http_cache import install_conditional_get
+from common.pagination import AfterParam, LimitParam, paginate, set_next_cursor
+from common.schema_check import ensure_schema
+from common.upsert import chunks, dedupe_rows, dialect_insert, insert_unless_exists, unique_violation, upsert_rows
 
 # Database Setup
 SQLALCHEMY_DATABASE_URL = "sqlite:///./database.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -38,7 +49,9 @@ employer_poc_association = Table(
     "employer_poc_association",
     Base.metadata,
     Column("employer_id", Integer, ForeignKey("employers.id"), primary_key=True),
-    Column("poc_id", Integer, ForeignKey("pocs.id"), primary_key=True)
+    Column("poc_id", Integer, ForeignKey("pocs.id"), primary_key=True),
+    # The primary key covers lookups by employer; this one serves "employers of a PoC"
+    Index("ix_employer_poc_association_poc_id", "poc_id"),
 )
 # Employer Table
 class Employer(Base):
@@ -69,15 +82,53 @@ class PointOfContact(Base):
  # Many-to-Many Relationship with Employers
     employers = relationship("Employer", secondary=employer_poc_association, back_populates="pocs")
 
-def create_database():
+# Alembic manages this database. Startup only compares a fingerprint of the models
+# and the migration files with the one stored in the database (PRAGMA user_version),
+# and migrates under a file lock if they differ, so N workers never race on DDL.
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATIONS_DIR = os.path.join(APP_DIR, "alembic")
+# Last revision whose DDL create_all() reproduces; unversioned databases made by
+# create_all() are stamped here and upgraded from it
+BASELINE_REVISION = "7b5100084ce1"
+
+def run_migrations(connection):
+    # Alembic is only imported when there is something to migrate
+    from alembic import command
+    from alembic.config import Config
+    from alembic.migration import MigrationContext
+
+    config = Config(os.path.join(APP_DIR, "alembic.ini"))
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    config.attributes["connection"] = connection
+    config.attributes["target_metadata"] = Base.metadata
+    if MigrationContext.configure(connection).get_current_revision() is None:
+        Base.metadata.create_all(connection)
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
 
-     Base.metadata.drop_all(bind=engine)  # Drops all tables
-     Base.metadata.create_all(bind=engine)  # Creates new tables
+def create_database():
+    revisions = sorted(os.listdir(os.path.join(MIGRATIONS_DIR, "versions")))
+    return ensure_schema(engine, Base.metadata, run_migrations, extra=[r for r in revisions if r.endswith(".py")])
 
 
 # Initialize FastAPI
 app = FastAPI()
 
+# ETag / If-None-Match for the hot read endpoints, keyed on the tables each one reads.
+# The sidecar file lets every worker process see writes made by the others.
+EMPLOYER_TABLES = ("employers", "companies", "pocs", "employer_poc_association")
+table_versions = install_conditional_get(app, engine, {
+    "/companies": ("companies",),
+    "/companies/{company_id}": ("companies",),
+    "/pocs": ("pocs",),
+    "/pocs/{poc_id}": ("pocs",),
+    "/employers": EMPLOYER_TABLES,
+    "/employers/{employer_id}": EMPLOYER_TABLES,
+}, epoch_path="./database.db.version")
+
+# Per-route latency / size / SQL metrics, exposed at /metrics
+metrics.install_request_metrics(app, engine)
+
 # Initialize Database
 create_database()
 
@@ -115,58 +166,115 @@ class EmployerBase(BaseModel):
     industry: str
     poc_ids: List[int] =[] # Accept multiple PoC IDs
     company_id: int
+
+class PoCIds(BaseModel):
+    poc_ids: List[int]
+
+class EmployerIds(BaseModel):
+    employer_ids: List[int]
   
 
 # --------- CRUD API Endpoints --------- #
 
+# A clash on a unique column is a 409 with `detail`; other constraint failures are raised as they are
+def raise_conflict(db: Session, exc: IntegrityError, detail: str):
+    db.rollback()
+    if unique_violation(exc):
+        raise HTTPException(status_code=409, detail=detail) from exc
+    raise exc
+
+# Constraint-driven inserts: the unique index, not a SELECT probe, detects duplicates.
+# Returns the new row's id, or None if the row already exists; a clash on
+# another unique column is a 409 with `detail`.
+def insert_id_unless_exists(db: Session, model, values: dict, conflict_columns, detail: str):
+    try:
+        obj = db.scalars(insert_unless_exists(db.get_bind(), model, values, conflict_columns)).first()
+    except IntegrityError as exc:
+        raise_conflict(db, exc, detail)
+    return None if obj is None else obj.id
+
+# Insert or update many rows by key_column, one statement per chunk
+def bulk_upsert(db: Session, model, items, key_column: str, detail: str):
+    table = model.__table__
+    rows = dedupe_rows(table, items, key_column)
+    results = []
+    try:
+        for chunk in chunks(rows):
+            results.extend(db.execute(upsert_rows(db.get_bind(), table, chunk, key_column)).all())
+    except IntegrityError as exc:
+        raise_conflict(db, exc, detail)
+    db.commit()
+    return {"upserted": len(results), "items": [{"id": r[0], key_column: r[1]} for r in results]}
+
 # Create a company
 @app.post("/companies")
 def create_company(company: CompanyBase, db: Session = Depends(get_db)):
-    existing_company = db.query(Company).filter(Company.name == company.name).first()
-    if existing_company:
+    company_id = insert_id_unless_exists(db, Company, company.dict(), ["name"],
+                                         "A company's email or phone is already used by another company")
+    if company_id is None:
         raise HTTPException(status_code=400, detail="Company already exists")
-    
-    db_company = Company(**company.dict())
-    db.add(db_company)
     db.commit()
-    db.refresh(db_company)
-    return {"message": "Company created successfully", "company_id": db_company.id}
+    return {"message": "Company created successfully", "company_id": company_id}
+
+# Bulk insert-or-update keyed on company name
+@app.put("/companies")
+def upsert_companies(companies: List[CompanyBase], db: Session = Depends(get_db)):
+    return bulk_upsert(db, Company, [c.dict() for c in companies], "name",
+                       "A company's email or phone is already used by another company")
 
-# Get all companies
+# Get all companies (one keyset page at a time), optionally only ?fields=
 @app.get("/companies")
-def get_companies(db: Session = Depends(get_db)):
-    return db.query(Company).all()
+def get_companies(response: Response, after: Optional[str] = AfterParam, limit: int = LimitParam,
+                  fields: Optional[str] = FieldsParam, db: Session = Depends(get_db)):
+    columns = parse_fields(Company, fields)
+    companies, next_cursor = paginate(query_fields(db, Company, columns), [Company.id], after, limit)
+    set_next_cursor(response, next_cursor)
+    return rows_to_dicts(companies, columns)
+
+# Get a single company by ID, optionally only ?fields=
+@app.get("/companies/{company_id}")
+def get_company(company_id: int, fields: Optional[str] = FieldsParam, db: Session = Depends(get_db)):
+    columns = parse_fields(Company, fields)
+    company = query_fields(db, Company, columns).filter(Company.id == company_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return rows_to_dicts([company], columns)[0]
 
 # create pocs
 
 @app.post("/pocs")
 def create_poc(poc: PoCBase, db: Session = Depends(get_db)):
-    #Ensure phone is stored as a string
-    phone_number = str(poc.phone)
-    # Check if email already exists
-    existing_poc = db.query(PointOfContact).filter(PointOfContact.email == poc.email).first()
-    if existing_poc:
+    poc_id = insert_id_unless_exists(db, PointOfContact, poc.dict(), ["email"],
+                                     "A PoC's phone is already used by another PoC")
+    if poc_id is None:
         raise HTTPException(status_code=400, detail="PoC with this email already exists")
-
-    db_poc = PointOfContact(name=poc.name, email=poc.email, phone=poc.phone)
-    db.add(db_poc)
     db.commit()
-    db.refresh(db_poc)
-    return {"message": "PoC created successfully", "poc_id": db_poc.id}
+    return {"message": "PoC created successfully", "poc_id": poc_id}
 
-# get all pocs
+# Bulk insert-or-update keyed on PoC email
+@app.put("/pocs")
+def upsert_pocs(pocs: List[PoCBase], db: Session = Depends(get_db)):
+    return bulk_upsert(db, PointOfContact, [p.dict() for p in pocs], "email",
+                       "A PoC's phone is already used by another PoC")
 
-@app.get("/pocs")
-def get_pocs(db: Session = Depends(get_db)):
-    return db.query(PointOfContact).all()
+# get all pocs (one keyset page at a time)
 
-# Get a single PoC by ID
+@app.get("/pocs")
+def get_pocs(response: Response, after: Optional[str] = AfterParam, limit: int = LimitParam,
+             fields: Optional[str] = FieldsParam, db: Session = Depends(get_db)):
+    columns = parse_fields(PointOfContact, fields)
+    pocs, next_cursor = paginate(query_fields(db, PointOfContact, columns), [PointOfContact.id], after, limit)
+    set_next_cursor(response, next_cursor)
+    return rows_to_dicts(pocs, columns)
+
+# Get a single PoC by ID, optionally only ?fields=
 @app.get("/pocs/{poc_id}")
-def get_poc(poc_id: int, db: Session = Depends(get_db)):
-    poc = db.query(PointOfContact).filter(PointOfContact.id == poc_id).first()
+def get_poc(poc_id: int, fields: Optional[str] = FieldsParam, db: Session = Depends(get_db)):
+    columns = parse_fields(PointOfContact, fields)
+    poc = query_fields(db, PointOfContact, columns).filter(PointOfContact.id == poc_id).first()
     if not poc:
         raise HTTPException(status_code=404, detail="PoC not found")
-    return poc
+    return rows_to_dicts([poc], columns)[0]
 
 # Update a PoC
 @app.put("/pocs/{poc_id}")
@@ -183,14 +291,12 @@ def update_poc(poc_id: int, poc: PoCBase, db: Session = Depends(get_db)):
     db.refresh(db_poc)
     return {"message": "PoC updated successfully", "poc": db_poc}
 
-# Delete a PoC
+# Delete a PoC and its employer links
 @app.delete("/pocs/{poc_id}")
 def delete_poc(poc_id: int, db: Session = Depends(get_db)):
-    db_poc = db.query(PointOfContact).filter(PointOfContact.id == poc_id).first()
-    if not db_poc:
+    deleted, _ = delete_linked(db, POC_SIDE, PointOfContact.id == poc_id)
+    if not deleted:
         raise HTTPException(status_code=404, detail="PoC not found")
-    
-    db.delete(db_poc)
     db.commit()
     return {"message": "PoC deleted successfully"}
 
@@ -198,75 +304,78 @@ def delete_poc(poc_id: int, db: Session = Depends(get_db)):
     
 @app.post("/employers")
 def create_employer(employer: EmployerBase, db: Session = Depends(get_db)):
-
-    # Check if Employer already exists by email
-    existing_employer = db.query(Employer).filter(Employer.email == employer.email).first()
-    if existing_employer:
-        raise HTTPException(status_code=400, detail="Employer with this email already exists")
-
-         # Ensure company exists
-    company = db.query(Company).filter(Company.id == employer.company_id).first()
-    if not company:
+    # INSERT ... SELECT <values> WHERE <company exists> ON CONFLICT (email) DO NOTHING RETURNING id.
+    # No row back means the email is taken or the company is missing; only then do we look which.
+    values = {
+        "name": employer.name,
+        "email": employer.email,
+        "phone": employer.phone,
+        "industry": employer.industry,
+        "company_id": employer.company_id,
+    }
+    table = Employer.__table__
+    source = select(*[literal(v, table.c[k].type).label(k) for k, v in values.items()]).where(
+        exists().where(Company.id == employer.company_id)
+    )
+    stmt = (
+        dialect_insert(db.get_bind(), table)
+        .from_select(list(values), source)
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(table.c.id)
+    )
+    try:
+        employer_id = db.scalar(stmt)
+    except IntegrityError as exc:
+        raise_conflict(db, exc, "An employer's name or phone is already used by another employer")
+    if employer_id is None:
+        if db.scalar(select(exists().where(Employer.email == employer.email))):
+            raise HTTPException(status_code=400, detail="Employer with this email already exists")
         raise HTTPException(status_code=400, detail="Company not found")
 
-    # Ensure PoC IDs are provided and exist
-    poc_list = []
+    # Link only the PoC ids that exist, and compare the count with the request
     if employer.poc_ids:
-        poc_list = db.query(PointOfContact).filter(PointOfContact.id.in_(employer.poc_ids)).all()
-        if len(poc_list) != len(employer.poc_ids):
+        pocs = select(literal(employer_id), PointOfContact.id).where(PointOfContact.id.in_(employer.poc_ids))
+        linked = db.execute(employer_poc_association.insert().from_select(["employer_id", "poc_id"], pocs)).rowcount
+        if linked != len(employer.poc_ids):
+            db.rollback()
             raise HTTPException(status_code=400, detail="One or more PoC IDs not found")
 
-    # Create employer
-    db_employer = Employer(name=employer.name, pocs=poc_list , email=employer.email, phone=employer.phone, company_id=employer.company_id)
+    db.commit()
+    return {"message": "Employer created successfully", "employer_id": employer_id}
 
-    # Link employer to multiple PoCs
-    db_employer.pocs = poc_list  #  assign multiple PoCs
+# Serialize an Employer whose company and pocs are already loaded
+def employer_to_dict(emp):
+    return {
+        "id": emp.id,
+        "name": emp.name,
+        "email": emp.email,
+        "phone": emp.phone,
+        "company": {
+            "id": emp.company.id,
+            "name": emp.company.name,
+            "industry": emp.company.industry
+        } if emp.company else None,
+        "pocs": [{"id": poc.id, "name": poc.name, "email": poc.email, "phone": poc.phone} for poc in emp.pocs]
+    }
 
-    db.add(db_employer)
-    db.commit()
-    db.refresh(db_employer)
-    
-    return {"message": "Employer created successfully", "employer_id": db_employer.id}
+# Load company and PoCs with one IN query each instead of a lazy load per employer
+employer_eager_options = (selectinload(Employer.company), selectinload(Employer.pocs))
 
-# Get all Employers
+# Get all Employers (one keyset page at a time)
 @app.get("/employers")
-def get_employers(db: Session = Depends(get_db)):
-    employers = db.query(Employer).all()
-    return [
-        {
-            "id": emp.id,
-            "name": emp.name,
-            "email": emp.email,
-            "phone": emp.phone,
-            "company": {
-                "id": emp.company.id,
-                "name": emp.company.name,
-                "industry": emp.company.industry
-            } if emp.company else None,
-            "pocs": [{"id": poc.id, "name": poc.name, "email": poc.email, "phone": poc.phone} for poc in emp.pocs]
-        }
-        for emp in employers
-    ]
+def get_employers(response: Response, after: Optional[str] = AfterParam, limit: int = LimitParam, db: Session = Depends(get_db)):
+    employers, next_cursor = paginate(db.query(Employer).options(*employer_eager_options), [Employer.id], after, limit)
+    set_next_cursor(response, next_cursor)
+    return [employer_to_dict(emp) for emp in employers]
 
 # Get a single Employer by ID
 @app.get("/employers/{employer_id}")
 def get_employer(employer_id: int, db: Session = Depends(get_db)):
-    employer = db.query(Employer).filter(Employer.id == employer_id).first()
+    employer = db.query(Employer).options(*employer_eager_options).filter(Employer.id == employer_id).first()
     if not employer:
         raise HTTPException(status_code=404, detail="Employer not found")
 
-    return {
-        "id": employer.id,
-        "name": employer.name,
-        "email": employer.email,
-        "phone": employer.phone,
-        "company": {
-            "id": employer.company.id,
-            "name": employer.company.name,
-            "industry": employer.company.industry
-        } if employer.company else None,
-        "pocs": [{"id": poc.id, "name": poc.name, "email": poc.email, "phone": poc.phone} for poc in employer.pocs]
-    }
+    return employer_to_dict(employer)
 
 # Update an Employer
 @app.put("/employers/{employer_id}")
@@ -274,31 +383,125 @@ def update_employer(employer_id: int, employer: EmployerBase, db: Session = Depe
     db_employer = db.query(Employer).filter(Employer.id == employer_id).first()
     if not db_employer:
         raise HTTPException(status_code=404, detail="Employer not found")
-    
-    # Fetch updated PoCs
-    db_pocs = db.query(PointOfContact).filter(PointOfContact.id.in_(employer.poc_ids)).all()
-
-    # Validate PoC IDs
-    if len(db_pocs) != len(employer.poc_ids):
-        raise HTTPException(status_code=400, detail="One or more PoCs not found")
+    check_link_ids(db, EMPLOYER_SIDE, employer_id, POC_SIDE, employer.poc_ids)
 
     # Update Employer fields
     db_employer.name = employer.name
     db_employer.industry = employer.industry
-    db_employer.pocs = db_pocs  # Update PoC assignments
+
+    # Update PoC assignments: drop the links not asked for, add the missing ones
+    db.execute(employer_poc_association.delete().where(
+        employer_poc_association.c.employer_id == employer_id,
+        employer_poc_association.c.poc_id.not_in(employer.poc_ids),
+    ))
+    add_links(db, EMPLOYER_SIDE, employer_id, POC_SIDE, employer.poc_ids)
 
     db.commit()
     db.refresh(db_employer)
     return {"message": "Employer updated successfully", "employer": db_employer}
 
-
-# Delete an Employer
+# Employer <-> PoC links are changed by their delta in SQL: one INSERT ... SELECT of
+# the pairs not linked yet, or one DELETE of the pairs given, so the ORM never
+# loads and diffs a whole collection. Each side is (model, association column, name).
+EMPLOYER_SIDE = (Employer, employer_poc_association.c.employer_id, "Employer")
+POC_SIDE = (PointOfContact, employer_poc_association.c.poc_id, "PoC")
+
+# 404 unless the owner exists, 400 unless every id exists; both in one query
+def check_link_ids(db: Session, owner_side, owner_id: int, other_side, ids):
+    owner_model, _, owner_name = owner_side
+    other_model, _, other_name = other_side
+    owner_found, others_found = db.execute(select(
+        select(func.count()).select_from(owner_model).where(owner_model.id == owner_id).scalar_subquery(),
+        select(func.count()).select_from(other_model).where(other_model.id.in_(ids)).scalar_subquery(),
+    )).one()
+    if not owner_found:
+        raise HTTPException(status_code=404, detail=f"{owner_name} not found")
+    if others_found != len(set(ids)):
+        raise HTTPException(status_code=400, detail=f"One or more {other_name} IDs not found")
+
+# Link owner_id to each of ids it is not linked to yet; returns how many links were added
+def add_links(db: Session, owner_side, owner_id: int, other_side, ids):
+    _, owner_column, _ = owner_side
+    other_model, other_column, _ = other_side
+    linked = exists().where(owner_column == owner_id, other_column == other_model.id)
+    pairs = select(literal(owner_id), other_model.id).where(other_model.id.in_(ids), ~linked)
+    return db.execute(employer_poc_association.insert().from_select([owner_column.key, other_column.key], pairs)).rowcount
+
+# Unlink owner_id from each of ids; returns how many links were removed
+def remove_links(db: Session, owner_side, owner_id: int, other_side, ids):
+    _, owner_column, _ = owner_side
+    _, other_column, _ = other_side
+    return db.execute(employer_poc_association.delete().where(owner_column == owner_id, other_column.in_(ids))).rowcount
+
+def change_links(db: Session, change, owner_side, owner_id: int, other_side, ids):
+    check_link_ids(db, owner_side, owner_id, other_side, ids)
+    count = change(db, owner_side, owner_id, other_side, ids)
+    db.commit()
+    return count
+
+# Link PoCs to an Employer (already linked ones are skipped)
+@app.post("/employers/{employer_id}/pocs")
+def link_employer_pocs(employer_id: int, body: PoCIds, db: Session = Depends(get_db)):
+    linked = change_links(db, add_links, EMPLOYER_SIDE, employer_id, POC_SIDE, body.poc_ids)
+    return {"message": "PoCs linked successfully", "linked": linked}
+
+# Unlink PoCs from an Employer
+@app.delete("/employers/{employer_id}/pocs")
+def unlink_employer_pocs(employer_id: int, body: PoCIds, db: Session = Depends(get_db)):
+    unlinked = change_links(db, remove_links, EMPLOYER_SIDE, employer_id, POC_SIDE, body.poc_ids)
+    return {"message": "PoCs unlinked successfully", "unlinked": unlinked}
+
+# Link one PoC to many Employers
+@app.post("/pocs/{poc_id}/employers")
+def link_poc_employers(poc_id: int, body: EmployerIds, db: Session = Depends(get_db)):
+    linked = change_links(db, add_links, POC_SIDE, poc_id, EMPLOYER_SIDE, body.employer_ids)
+    return {"message": "Employers linked successfully", "linked": linked}
+
+# Unlink one PoC from many Employers
+@app.delete("/pocs/{poc_id}/employers")
+def unlink_poc_employers(poc_id: int, body: EmployerIds, db: Session = Depends(get_db)):
+    unlinked = change_links(db, remove_links, POC_SIDE, poc_id, EMPLOYER_SIDE, body.employer_ids)
+    return {"message": "Employers unlinked successfully", "unlinked": unlinked}
+
+
+# Delete rows of a linked model with set-based DELETEs: first their
+# employer_poc_association rows (which db.delete() would load collection by
+# collection), then the rows. Not committed; returns (rows, links) deleted.
+def delete_linked(db: Session, side, *conditions):
+    model, link_column, _ = side
+    links = db.execute(employer_poc_association.delete().where(link_column.in_(select(model.id).where(*conditions)))).rowcount
+    rows = db.execute(model.__table__.delete().where(*conditions)).rowcount
+    return rows, links
+
+# Delete an Employer and its PoC links
 @app.delete("/employers/{employer_id}")
 def delete_employer(employer_id: int, db: Session = Depends(get_db)):
-    db_employer = db.query(Employer).filter(Employer.id == employer_id).first()
-    if not db_employer:
+    deleted, _ = delete_linked(db, EMPLOYER_SIDE, Employer.id == employer_id)
+    if not deleted:
         raise HTTPException(status_code=404, detail="Employer not found")
-    
-    db.delete(db_employer)
     db.commit()
-    return {"message": "Employer deleted successfully"}
\ No newline at end of file
+    return {"message": "Employer deleted successfully"}
+
+# Delete all Employers of a company, with their PoC links, in one transaction
+@app.delete("/companies/{company_id}/employers")
+def delete_company_employers(company_id: int, db: Session = Depends(get_db)):
+    if not db.scalar(select(exists().where(Company.id == company_id))):
+        raise HTTPException(status_code=404, detail="Company not found")
+    employers, links = delete_linked(db, EMPLOYER_SIDE, Employer.company_id == company_id)
+    db.commit()
+    return {"message": "Employers deleted successfully", "employers_deleted": employers, "poc_links_deleted": links}
+
+# Delete a company with its Employers and their PoC links, in one transaction
+@app.delete("/companies/{company_id}")
+def delete_company(company_id: int, db: Session = Depends(get_db)):
+    employers, links = delete_linked(db, EMPLOYER_SIDE, Employer.company_id == company_id)
+    if not db.execute(Company.__table__.delete().where(Company.id == company_id)).rowcount:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Company not found")
+    db.commit()
+    return {"message": "Company deleted successfully", "employers_deleted": employers, "poc_links_deleted": links}
+
+# Prometheus scrape endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return metrics.render_prometheus()
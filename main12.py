@@ -1,12 +1,21 @@
-from fastapi import FastAPI, HTTPException, Depends
+import datetime
+import json
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
-from database import SessionLocal, create_database, JobPosting
-from pydantic import BaseModel
+from common import metrics
+from database import SessionLocal, create_database, engine, JobPosting
+from pydantic import BaseModel, ValidationError
 from typing import Optional
 
 # Initialize FastAPI app
 app = FastAPI()
 
+# Per-route latency / size / SQL metrics, exposed at /metrics
+metrics.install_request_metrics(app, engine)
+
 # Initialize database
 create_database()
 
@@ -33,14 +42,122 @@ def create_job_post(job: JobPostingCreate, db: Session = Depends(get_db)):
     db.refresh(db_job_post)
     return {"message": "Job posting created successfully", "job_id": db_job_post.id}
 
+# Rows per INSERT transaction for bulk ingestion (one commit / fsync per batch)
+BULK_BATCH_SIZE = 5000
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# Yield (index, raw row) pairs from a JSON array body or a streamed NDJSON body
+async def iter_bulk_rows(request: Request):
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith(NDJSON_CONTENT_TYPES):
+        try:
+            rows = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        for index, row in enumerate(rows):
+            yield index, row
+        return
+
+    index = 0
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield index, line
+                index += 1
+    if pending.strip():
+        yield index, pending
+
+# Insert one batch with a single driver-level executemany and one commit.
+# The batch runs inside one write transaction, so SQLite hands out contiguous
+# rowids and the new IDs can be derived from last_insert_rowid().
+def _insert_rows(db: Session, batch):
+    conn = db.connection()
+    # Same text format SQLAlchemy's SQLite DateTime type stores
+    posted_at = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+    conn.exec_driver_sql(
+        "INSERT INTO job_postings (title, description, company, posted_at) VALUES (?, ?, ?, ?)",
+        [(job.title, job.description, job.company, posted_at) for _, job in batch],
+    )
+    last_id = conn.exec_driver_sql("SELECT last_insert_rowid()").scalar()
+    db.commit()
+    first_id = last_id - len(batch) + 1
+    return [{"index": index, "job_id": first_id + n} for n, (index, _) in enumerate(batch)]
+
+# A rejected row fails its whole batch, so the batch is split in halves until the
+# failing rows are alone: the other rows are still inserted and each error names
+# its own row. An OperationalError (locked database, full disk) fails every row.
+def insert_job_batch(db: Session, batch):
+    try:
+        return _insert_rows(db, batch)
+    except Exception as exc:
+        db.rollback()
+        if len(batch) > 1 and not isinstance(exc, OperationalError):
+            middle = len(batch) // 2
+            return insert_job_batch(db, batch[:middle]) + insert_job_batch(db, batch[middle:])
+        error = f"Database insert failed: {getattr(exc, 'orig', None) or exc}"
+        return [{"index": index, "error": error} for index, _ in batch]
+
+# Endpoint to create many job postings at once (JSON array or NDJSON stream)
+@app.post("/job-postings/bulk")
+async def create_job_posts_bulk(request: Request, db: Session = Depends(get_db)):
+    results = []
+    batch = []
+    async for index, row in iter_bulk_rows(request):
+        try:
+            if isinstance(row, bytes):
+                job = JobPostingCreate.model_validate_json(row)
+            else:
+                job = JobPostingCreate.model_validate(row)
+        except ValidationError as e:
+            results.append({"index": index, "error": json.loads(e.json(include_url=False))})
+            continue
+        batch.append((index, job))
+        if len(batch) >= BULK_BATCH_SIZE:
+            results.extend(await run_in_threadpool(insert_job_batch, db, batch))
+            batch = []
+    if batch:
+        results.extend(await run_in_threadpool(insert_job_batch, db, batch))
+
+    results.sort(key=lambda r: r["index"])
+    created = sum(1 for r in results if "job_id" in r)
+    # Results are plain dicts; skip jsonable_encoder, it dominates on 100k-row responses
+    return JSONResponse({"created": created, "failed": len(results) - created, "results": results})
+
+# Endpoint to delete job postings by filter: one set-based DELETE, no rows loaded.
+# At least one filter is required, so a bare DELETE cannot empty the table.
+@app.delete("/job-postings")
+def delete_job_posts(
+    posted_before: Optional[datetime.datetime] = Query(None, description="Delete postings posted before this time"),
+    company: Optional[str] = Query(None, description="Delete only this company's postings"),
+    db: Session = Depends(get_db),
+):
+    conditions = []
+    if posted_before is not None:
+        conditions.append(JobPosting.posted_at < posted_before)
+    if company is not None:
+        conditions.append(JobPosting.company == company)
+    if not conditions:
+        raise HTTPException(status_code=400, detail="Give posted_before and/or company")
+    deleted = db.execute(JobPosting.__table__.delete().where(*conditions)).rowcount
+    db.commit()
+    return {"message": f"Deleted {deleted} job postings", "deleted": deleted}
+
 # Endpoint to delete a job posting by ID
 @app.delete("/job-postings/{job_id}")
 def delete_job_post(job_id: int, db: Session = Depends(get_db)):
-    db_job_post = db.query(JobPosting).filter(JobPosting.id == job_id).first()
-    
-    if db_job_post is None:
+    deleted = db.execute(JobPosting.__table__.delete().where(JobPosting.id == job_id)).rowcount
+    if not deleted:
         raise HTTPException(status_code=404, detail="Job posting not found")
-    
-    db.delete(db_job_post)
     db.commit()
     return {"message": f"Job posting with ID {job_id} deleted successfully"}
+
+# Prometheus scrape endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return metrics.render_prometheus()
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _run_in_tmp(tmp_path_factory):
+    # The apps also write files relative to the cwd after import (ETag sidecar,
+    # slow query log, schema lock); keep them out of the checkout
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(tmp_path_factory.mktemp("cwd"))
+        yield
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    # main.py opens ./database.db at import, so import it from an empty directory
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("main"))
+    try:
+        import main
+    finally:
+        os.chdir(cwd)
+    return main
+
+
+@pytest.fixture(scope="session")
+def main12_module(tmp_path_factory):
+    # main12.py (through database.py) opens ./job_postings.db at import
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("main12"))
+    try:
+        import main12
+    finally:
+        os.chdir(cwd)
+    return main12
+
+
+@pytest.fixture(scope="session")
+def portal(tmp_path_factory):
+    """The Portal's app package (Portal/app) on a database of its own, in sync mode."""
+    directory = tmp_path_factory.mktemp("portal")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATABASE_URL", f"sqlite:///{directory / 'portal.db'}")
+        mp.setenv("DB_ASYNC", "0")
+        mp.setenv("WRITE_QUEUE", "0")
+        mp.setenv("FRONTEND_BUILD_PATH", str(directory / "dist"))
+        mp.syspath_prepend(os.path.join(REPO_DIR, "Portal"))
+        mp.chdir(directory)
+        import app.main
+    return sys.modules["app"]
@@ -0,0 +1,57 @@
+"""POST /job-postings/bulk: every row gets its own id or its own error."""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def bulk(main12_module, monkeypatch):
+    # Small batches, so a few hundred rows cover several of them
+    monkeypatch.setattr(main12_module, "BULK_BATCH_SIZE", 64)
+    return main12_module, TestClient(main12_module.app)
+
+
+def _titles(main12, ids):
+    with main12.engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"SELECT id, title FROM job_postings WHERE id IN ({', '.join(map(str, ids))})").all()
+    return dict(rows)
+
+
+@pytest.mark.parametrize("ndjson", [False, True])
+def test_returned_ids_belong_to_their_rows(bulk, ndjson):
+    main12, client = bulk
+    rows = [{"title": f"Bulk {ndjson} {i}", "company": "c"} for i in range(300)]
+    rows[5] = {"company": "no title"}
+    if ndjson:
+        body = "\n".join(json.dumps(row) for row in rows).encode()
+        response = client.post("/job-postings/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    else:
+        response = client.post("/job-postings/bulk", json=rows)
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert (report["created"], report["failed"]) == (299, 1)
+    assert [result["index"] for result in report["results"]] == list(range(300))
+    assert "error" in report["results"][5]
+    created = {result["job_id"]: result["index"] for result in report["results"] if "job_id" in result}
+    assert {job_id: rows[index]["title"] for job_id, index in created.items()} == _titles(main12, created)
+
+
+def test_rejected_rows_fail_alone(bulk):
+    main12, client = bulk
+    rows = [{"title": f"Unique {i}", "company": "c"} for i in range(200)]
+    rows[10]["title"] = rows[3]["title"]
+    rows[150]["title"] = rows[149]["title"]
+    with main12.engine.begin() as conn:
+        conn.exec_driver_sql("CREATE UNIQUE INDEX test_uq_title ON job_postings (title) WHERE title LIKE 'Unique %'")
+    try:
+        report = client.post("/job-postings/bulk", json=rows).json()
+    finally:
+        with main12.engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX test_uq_title")
+    failed = {result["index"]: result["error"] for result in report["results"] if "error" in result}
+    assert set(failed) == {10, 150}
+    assert all("UNIQUE constraint failed" in error for error in failed.values())
+    created = {result["job_id"]: result["index"] for result in report["results"] if "job_id" in result}
+    assert len(created) == 198
+    assert {job_id: rows[index]["title"] for job_id, index in created.items()} == _titles(main12, created)
@@ -0,0 +1,65 @@
+"""The change feed: every write is listed after `since`, and a client behind the pruned log is told to resync."""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, func, insert, select, update
+
+
+@pytest.fixture
+def client(portal):
+    return TestClient(portal.main.app)
+
+
+def _last_seq(portal):
+    with portal.database.engine.connect() as conn:
+        return conn.scalar(select(func.max(portal.models.ChangeLog.seq))) or 0
+
+
+def _company(stamp):
+    return {"name": f"Changed company {stamp}", "email": f"changes{stamp}@example.com", "phone": f"changes{stamp}",
+            "industry": "i", "about": "a", "location": "l", "description": "d", "title": "t", "website": "w",
+            "established": 2000}
+
+
+def test_writes_are_listed_after_since_in_order(portal, client):
+    since = _last_seq(portal)
+    company_id = client.post("/companies", json=_company(time.time_ns())).json()["id"]
+    company = portal.models.Company
+    with portal.database.engine.begin() as conn:
+        # Core statements fire no ORM events; the triggers still record them
+        conn.execute(update(company).where(company.id == company_id).values(about="b"))
+        conn.execute(delete(company).where(company.id == company_id))
+
+    response = client.get("/changes", params={"since": since})
+    assert response.status_code == 200
+    feed = response.json()
+    assert [(c["entity"], c["id"], c["op"]) for c in feed["changes"]] == [
+        ("company", company_id, "insert"), ("company", company_id, "update"), ("company", company_id, "delete"),
+    ]
+    assert [c["seq"] for c in feed["changes"]] == list(range(since + 1, since + 4))
+    assert feed["last_seq"] == since + 3
+
+    caught_up = client.get("/changes", params={"since": feed["last_seq"]}).json()
+    assert caught_up == {"changes": [], "last_seq": feed["last_seq"]}
+
+
+def test_pruned_since_is_410_and_a_stream_reset(portal, client):
+    client.post("/companies", json=_company(time.time_ns()))
+    behind = _last_seq(portal) - 1
+    change = portal.models.ChangeLog
+    with portal.database.engine.begin() as conn:
+        # A row KEEP_CHANGES ahead makes the prune trigger drop everything before it
+        conn.execute(insert(change).values(seq=behind + 1 + portal.changes.KEEP_CHANGES,
+                                           entity="company", entity_id=0, op="update"))
+        assert conn.scalar(select(func.min(change.seq))) == behind + 1 + portal.changes.KEEP_CHANGES
+
+    response = client.get("/changes", params={"since": behind})
+    assert response.status_code == 410
+    assert "resync" in response.json()["detail"]
+    # since=0 asks for whatever is kept, which is never a gap
+    assert client.get("/changes").status_code == 200
+
+    for request in ({"params": {"since": behind}}, {"headers": {"Last-Event-ID": str(behind)}}):
+        stream = client.get("/changes/stream", **request)
+        assert stream.text.startswith("event: reset\n")
@@ -0,0 +1,61 @@
+"""ETags change with the tables a route reads from, and only with committed writes to them."""
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+
+@pytest.fixture
+def poc(app_module):
+    client = TestClient(app_module.app)
+    stamp = time.time_ns()
+    poc_id = client.post("/pocs", json={"name": "Before", "email": f"etag{stamp}@example.com",
+                                        "phone": f"etag{stamp}"}).json()["poc_id"]
+    return app_module, client, poc_id
+
+
+def _get(client, poc_id, etag=None):
+    return client.get(f"/pocs/{poc_id}", headers={"If-None-Match": etag} if etag else {})
+
+
+def test_unchanged_row_is_304(poc):
+    _, client, poc_id = poc
+    first = _get(client, poc_id)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    again = _get(client, poc_id, etag)
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+
+
+def test_update_invalidates_the_etag(poc):
+    _, client, poc_id = poc
+    before = _get(client, poc_id)
+    body = before.json()
+    assert client.put(f"/pocs/{poc_id}", json={**body, "name": "After"}).status_code == 200
+    after = _get(client, poc_id, before.headers["etag"])
+    assert after.status_code == 200
+    assert after.json()["name"] == "After"
+    assert after.headers["etag"] != before.headers["etag"]
+    assert _get(client, poc_id, after.headers["etag"]).status_code == 304
+
+
+def test_rolled_back_write_keeps_the_etag(poc):
+    main, client, poc_id = poc
+    etag = _get(client, poc_id).headers["etag"]
+    with main.engine.connect() as conn:
+        conn.execute(update(main.PointOfContact).where(main.PointOfContact.id == poc_id).values(name="Never"))
+        conn.rollback()
+    assert _get(client, poc_id, etag).status_code == 304
+
+
+def test_write_in_another_worker_invalidates_the_etag(poc):
+    main, client, poc_id = poc
+    etag = _get(client, poc_id).headers["etag"]
+    # Another process only moves the sidecar's mtime; its counters are not ours
+    epoch_path = main.table_versions.epoch_path
+    later = os.stat(epoch_path).st_mtime_ns + 1_000_000
+    os.utime(epoch_path, ns=(later, later))
+    assert _get(client, poc_id, etag).status_code == 200
@@ -0,0 +1,150 @@
+"""A clash on a unique column is a 409 on every path; other constraint failures are not."""
+import asyncio
+import itertools
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+_ids = itertools.count(1)
+
+
+def _company(n, **overrides):
+    return {"name": f"Company {n}", "email": f"c{n}@example.com", "phone": f"c{n}", "industry": "i", "about": "a",
+            "location": "l", "description": "d", "title": "t", "website": "w", "established": 2000, **overrides}
+
+
+def _employer(n, company_id, **overrides):
+    return {"name": f"Employer {n}", "email": f"e{n}@example.com", "phone": f"e{n}", "industry": "i",
+            "company_id": company_id, "poc_ids": [], **overrides}
+
+
+@pytest.fixture(scope="module")
+def main_client(app_module):
+    return TestClient(app_module.app)
+
+
+def test_main_company_with_taken_email_is_409(main_client):
+    taken, new = next(_ids), next(_ids)
+    assert main_client.post("/companies", json=_company(taken)).status_code == 200
+    response = main_client.post("/companies", json=_company(new, email=f"c{taken}@example.com"))
+    assert response.status_code == 409, response.text
+    # The conflict column itself is still the 400 it always was
+    assert main_client.post("/companies", json=_company(taken, email=f"c{new}@example.com")).status_code == 400
+
+
+def test_main_poc_with_taken_phone_is_409(main_client):
+    taken, new = next(_ids), next(_ids)
+    assert main_client.post("/pocs", json={"name": "p", "email": f"p{taken}@example.com", "phone": f"p{taken}"}).status_code == 200
+    response = main_client.post("/pocs", json={"name": "p", "email": f"p{new}@example.com", "phone": f"p{taken}"})
+    assert response.status_code == 409, response.text
+
+
+@pytest.mark.parametrize("column", ["name", "phone"])
+def test_main_employer_with_taken_name_or_phone_is_409(main_client, column):
+    company_id = main_client.post("/companies", json=_company(next(_ids))).json()["company_id"]
+    taken, new = _employer(next(_ids), company_id), _employer(next(_ids), company_id)
+    assert main_client.post("/employers", json=taken).status_code == 200
+    response = main_client.post("/employers", json={**new, column: taken[column]})
+    assert response.status_code == 409, response.text
+
+
+def test_main_bulk_upsert_clash_is_409_like_the_single_insert(main_client):
+    taken, new = next(_ids), next(_ids)
+    main_client.post("/companies", json=_company(taken))
+    response = main_client.put("/companies", json=[_company(new, phone=f"c{taken}")])
+    assert response.status_code == 409, response.text
+    single = main_client.post("/companies", json=_company(new, phone=f"c{taken}"))
+    assert single.json()["detail"] == response.json()["detail"]
+
+
+def _portal_paths(portal):
+    """Run a sync crud function directly, through the write queue, and its crud_async twin."""
+    from app import crud, crud_async
+    from app.write_queue import WriteQueue
+
+    def direct(name, *args):
+        with portal.database.SessionLocal() as db:
+            return getattr(crud, name)(db, *args)
+
+    def queued(name, *args):
+        writer = WriteQueue(portal.database.engine, 8, 1, 100)
+        try:
+            return asyncio.run(writer.submit(getattr(crud, name), *args))
+        finally:
+            writer.shutdown()
+
+    def async_(name, *args):
+        async def run():
+            engine = create_async_engine(portal.database.DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1))
+            try:
+                async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                    return await getattr(crud_async, name)(db, *args)
+            finally:
+                await engine.dispose()
+        return asyncio.run(run())
+
+    return {"direct": direct, "write queue": queued, "async": async_}
+
+
+def _status(call):
+    try:
+        call()
+    except HTTPException as exc:
+        return exc.status_code, exc.detail
+    return 200, None
+
+
+def test_portal_paths_agree_on_company_and_employer_clashes(portal):
+    from app import schemas
+
+    results = {}
+    for path, run in _portal_paths(portal).items():
+        taken = run("create_company", schemas.CompanyBase(**_company(next(_ids))))
+        results.setdefault("company email", set()).add(_status(
+            lambda: run("create_company", schemas.CompanyBase(**_company(next(_ids), email=taken.email)))
+        ))
+        employer = _employer(next(_ids), taken.id)
+        run("create_employer", schemas.EmployerBase(**employer))
+        for column in ("name", "phone"):
+            results.setdefault(f"employer {column}", set()).add(_status(
+                lambda: run("create_employer", schemas.EmployerBase(**_employer(next(_ids), taken.id, **{column: employer[column]})))
+            ))
+    for clash, statuses in results.items():
+        assert len(statuses) == 1 and next(iter(statuses))[0] == 409, (clash, statuses)
+
+
+def test_portal_user_email_clash_is_409_other_failures_are_not(portal):
+    from app import crud, schemas
+
+    n = next(_ids)
+    user = {"username": f"user{n}", "email": f"u{n}@example.com", "role": "employee", "password": "x"}
+    with portal.database.SessionLocal() as db:
+        crud.create_user(db, schemas.UserCreate(**user), "hash")
+        with pytest.raises(HTTPException) as taken:
+            crud.create_user(db, schemas.UserCreate(**{**user, "username": f"user{n}b"}), "hash")
+        assert taken.value.status_code == 409
+        # A CHECK failure is not reported as a taken email
+        unknown_role = schemas.UserCreate.model_construct(**{**user, "username": f"user{n}c", "email": f"u{n}c@example.com", "role": "admin"})
+        with pytest.raises(IntegrityError, match="CHECK constraint failed"):
+            crud.create_user(db, unknown_role, "hash")
+
+
+def test_portal_duplicate_signup_is_rejected_before_hashing(portal, monkeypatch):
+    hashed = []
+
+    async def fake_hash(password):
+        hashed.append(password)
+        return "hash"
+
+    monkeypatch.setattr(portal.main.password_pool, "hash", fake_hash)
+    client = TestClient(portal.main.app)
+    n = next(_ids)
+    user = {"username": f"signup{n}", "email": f"s{n}@example.com", "role": "employee", "password": "x"}
+    assert client.post("/signup/", json=user).status_code == 200
+    assert len(hashed) == 1
+    assert client.post("/signup/", json={**user, "email": f"s{n}b@example.com"}).status_code == 400
+    assert client.post("/signup/", json={**user, "username": f"signup{n}b"}).status_code == 409
+    assert len(hashed) == 1
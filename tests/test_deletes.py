@@ -0,0 +1,101 @@
+"""Set-based deletes remove exactly the matching rows and their employer <-> PoC links."""
+import datetime
+import itertools
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+_ids = itertools.count(1)
+
+
+@pytest.fixture
+def linked(app_module):
+    """Two companies; A has employers e1 (PoCs p1, p2) and e2 (p1), B has e3 (p1)."""
+    main = app_module
+    client = TestClient(main.app)
+    stamp = f"{time.time_ns()}-{next(_ids)}"
+
+    def post(path, body, key):
+        response = client.post(path, json=body)
+        assert response.status_code == 200, response.text
+        return response.json()[key]
+
+    companies = [post("/companies", {"name": f"Delete {name} {stamp}", "email": f"del{name}{stamp}@example.com",
+                                     "phone": f"del{name}{stamp}", "industry": "i", "about": "a", "location": "l",
+                                     "description": "d", "title": "t", "website": "w", "established": 2000},
+                      "company_id") for name in "AB"]
+    pocs = [post("/pocs", {"name": "p", "email": f"delp{n}{stamp}@example.com", "phone": f"delp{n}{stamp}"}, "poc_id")
+            for n in range(2)]
+
+    def employer(n, company_id, poc_ids):
+        return post("/employers", {"name": f"Delete e{n} {stamp}", "email": f"dele{n}{stamp}@example.com",
+                                   "phone": f"dele{n}{stamp}", "industry": "i", "company_id": company_id,
+                                   "poc_ids": poc_ids}, "employer_id")
+
+    employers = [employer(1, companies[0], pocs), employer(2, companies[0], pocs[:1]), employer(3, companies[1], pocs[:1])]
+    return main, client, companies, pocs, employers
+
+
+def _state(main, employers, pocs):
+    link = main.employer_poc_association
+    with main.engine.connect() as conn:
+        left = set(conn.scalars(select(main.Employer.id).where(main.Employer.id.in_(employers))))
+        links = set(conn.execute(select(link.c.employer_id, link.c.poc_id).where(link.c.poc_id.in_(pocs))).tuples())
+        pocs_left = set(conn.scalars(select(main.PointOfContact.id).where(main.PointOfContact.id.in_(pocs))))
+    return left, links, pocs_left
+
+
+def test_deleting_a_companys_employers_removes_their_links(linked):
+    main, client, (a, b), pocs, (e1, e2, e3) = linked
+    response = client.delete(f"/companies/{a}/employers")
+    assert response.status_code == 200
+    assert response.json()["employers_deleted"] == 2
+    assert response.json()["poc_links_deleted"] == 3
+    assert _state(main, [e1, e2, e3], pocs) == ({e3}, {(e3, pocs[0])}, set(pocs))
+    assert client.get(f"/companies/{a}").status_code == 200
+
+
+def test_deleting_a_company_removes_its_employers_and_links(linked):
+    main, client, (a, b), pocs, (e1, e2, e3) = linked
+    response = client.delete(f"/companies/{b}")
+    assert response.status_code == 200
+    assert (response.json()["employers_deleted"], response.json()["poc_links_deleted"]) == (1, 1)
+    assert _state(main, [e1, e2, e3], pocs) == ({e1, e2}, {(e1, pocs[0]), (e1, pocs[1]), (e2, pocs[0])}, set(pocs))
+    assert client.get(f"/companies/{b}").status_code == 404
+
+
+def test_deleting_a_poc_removes_only_its_links(linked):
+    main, client, _, pocs, (e1, e2, e3) = linked
+    assert client.delete(f"/pocs/{pocs[0]}").status_code == 200
+    assert _state(main, [e1, e2, e3], pocs) == ({e1, e2, e3}, {(e1, pocs[1])}, {pocs[1]})
+
+
+@pytest.mark.parametrize("path", ["/companies/{}/employers", "/companies/{}"])
+def test_missing_company_is_404(app_module, path):
+    assert TestClient(app_module.app).delete(path.format(10 ** 9)).status_code == 404
+
+
+def test_job_postings_are_deleted_by_filter(main12_module):
+    main12 = main12_module
+    client = TestClient(main12.app)
+    company = f"Delete {time.time_ns()}"
+    old = datetime.datetime(2000, 1, 1)
+    with main12.engine.begin() as conn:
+        conn.execute(main12.JobPosting.__table__.insert(), [
+            {"title": "old", "company": company, "posted_at": old},
+            {"title": "old elsewhere", "company": f"{company} other", "posted_at": old},
+            {"title": "new", "company": company, "posted_at": datetime.datetime(2100, 1, 1)},
+        ])
+
+    def titles():
+        with main12.engine.connect() as conn:
+            return set(conn.scalars(select(main12.JobPosting.title).where(main12.JobPosting.company.startswith(company))))
+
+    assert client.delete("/job-postings").status_code == 400
+    response = client.delete("/job-postings", params={"posted_before": "2001-01-01T00:00:00", "company": company})
+    assert response.json()["deleted"] == 1
+    assert titles() == {"old elsewhere", "new"}
+    assert client.delete("/job-postings", params={"company": company}).json()["deleted"] == 1
+    assert titles() == {"old elsewhere"}
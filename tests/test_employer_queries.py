@@ -0,0 +1,58 @@
+"""GET /employers and GET /employers/{id} must not issue a query per employer (N+1)."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+
+def _seed(main, n_employers):
+    with main.engine.begin() as conn:
+        conn.execute(main.Company.__table__.delete())
+        conn.execute(main.PointOfContact.__table__.delete())
+        conn.execute(main.Employer.__table__.delete())
+        conn.execute(main.employer_poc_association.delete())
+        conn.execute(main.Company.__table__.insert(), [
+            {"id": i, "name": f"Company {i}", "email": f"c{i}@example.com", "title": "t", "description": "d"}
+            for i in range(1, n_employers + 1)
+        ])
+        conn.execute(main.PointOfContact.__table__.insert(), [
+            {"id": i, "name": f"PoC {i}", "email": f"p{i}@example.com", "phone": str(i)} for i in range(1, n_employers + 2)
+        ])
+        conn.execute(main.Employer.__table__.insert(), [
+            {"id": i, "name": f"Employer {i}", "email": f"e{i}@example.com", "phone": str(i), "company_id": i}
+            for i in range(1, n_employers + 1)
+        ])
+        conn.execute(main.employer_poc_association.insert(), [
+            {"employer_id": i, "poc_id": poc} for i in range(1, n_employers + 1) for poc in (i, i + 1)
+        ])
+
+
+def _count_statements(main, url):
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(main.engine, "before_cursor_execute", _count)
+    try:
+        response = TestClient(main.app).get(url)
+    finally:
+        event.remove(main.engine, "before_cursor_execute", _count)
+    assert response.status_code == 200, response.text
+    return response.json(), statements
+
+
+@pytest.mark.parametrize("n_employers", [1, 10, 50])
+def test_employer_list_query_count_is_constant(app_module, n_employers):
+    _seed(app_module, n_employers)
+    employers, statements = _count_statements(app_module, f"/employers?limit={n_employers}")
+    assert len(employers) == n_employers
+    assert all(emp["company"] and len(emp["pocs"]) == 2 for emp in employers)
+    # employers, their companies (one IN query), their PoCs (one IN query)
+    assert len(statements) == 3, statements
+
+
+def test_employer_detail_query_count(app_module):
+    _seed(app_module, 10)
+    employer, statements = _count_statements(app_module, "/employers/5")
+    assert employer["company"]["id"] == 5 and len(employer["pocs"]) == 2
+    assert len(statements) == 3, statements
@@ -0,0 +1,51 @@
+"""Keyset pagination: walking X-Next-Cursor visits every row once, and bad cursors are a 400."""
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+
+@pytest.fixture(scope="module")
+def seeded(app_module):
+    main = app_module
+    with main.engine.begin() as conn:
+        first = conn.scalar(select(main.Company.id).order_by(main.Company.id.desc()).limit(1)) or 0
+        conn.execute(main.Company.__table__.insert(), [
+            {"name": f"Paged company {i}", "email": f"paged{i}@example.com", "title": "t", "description": "d"}
+            for i in range(first + 1, first + 51)
+        ])
+        ids = conn.scalars(select(main.Company.id).order_by(main.Company.id)).all()
+    return main, ids
+
+
+def test_walking_the_cursor_visits_every_row_once(seeded):
+    main, ids = seeded
+    client = TestClient(main.app)
+    seen, after, pages = [], None, 0
+    while True:
+        params = {"limit": 7, **({"after": after} if after else {})}
+        response = client.get("/companies", params=params)
+        assert response.status_code == 200, response.text
+        page = [company["id"] for company in response.json()]
+        assert len(page) <= 7
+        seen += page
+        pages += 1
+        after = response.headers.get("X-Next-Cursor")
+        if after is None:
+            break
+    assert seen == ids
+    assert pages == -(-len(ids) // 7)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all!",
+    base64.urlsafe_b64encode(b"{}").decode(),  # not a list
+    base64.urlsafe_b64encode(json.dumps([1, 2]).encode()).decode(),  # one value too many for /companies
+])
+def test_bad_cursor_is_400(seeded, cursor):
+    main, _ = seeded
+    response = TestClient(main.app).get("/companies", params={"after": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"